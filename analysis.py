@@ -4,137 +4,171 @@ import os
 import glob
 import plotly.express as px
 import json
+import hashlib
+import pickle
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import significance
+import spin_format
+from list_registry import ListRegistry, lookup_vector
+import rolling
+import session_db
+from session_db import machine_name
 
 csv_directory = 'csv_files'
 list_file_path = 'predefined_lists.json'
+ANALYSIS_CACHE_BYTES = 128 << 20
+# set to a folder to also keep analysis results on disk between restarts
+ANALYSIS_CACHE_DIR = os.environ.get('ANALYSIS_CACHE_DIR')
+# least recently used results are deleted once the folder holds more than this
+ANALYSIS_CACHE_DISK_BYTES = 1 << 30
+WHEEL_LAYOUT = [0, 32, 15, 19, 4, 21, 2, 25, 17, 34, 6, 27, 13, 36, 11, 30, 8, 23, 10, 5, 24, 16, 33, 1, 20, 14, 31, 9, 22, 18, 29, 7, 28, 12, 35, 3, 26]
 
 
 # Ensure the directory for CSV files exists
 if not os.path.exists(csv_directory):
     os.makedirs(csv_directory)
 
+DEFAULT_LISTS = {
+    "Big": [22, 18, 29, 7, 28, 12, 35, 3, 26, 0, 32, 15, 19, 4, 21, 2, 25],
+    "Orph": [1, 20, 14, 31, 9, 17, 34, 6],
+    "Small": [27, 13, 36, 11, 30, 8, 23, 10, 5, 24, 16, 33],
+    "even": [2, 4, 6, 8, 10, 12, 14, 16, 18, 20, 22, 24, 26, 28, 30, 32, 34, 36],
+    "odd": [1, 3, 5, 7, 9, 11, 13, 15, 17, 19, 21, 23, 25, 27, 29, 31, 33, 35],
+    "red": [1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36],
+    "black": [2, 4, 6, 8, 10, 11, 13, 15, 17, 20, 22, 24, 26, 28, 29, 31, 33, 35],
+    "1-12": list(range(1, 13)),
+    "13-24": list(range(13, 25)),
+    "25-36": list(range(25, 37)),
+    "1stHalf": list(range(1, 19)),
+    "2ndHalf": list(range(19, 37)),
+    "1stColumn": [1, 4, 7, 10, 13, 16, 19, 22, 25, 28, 31, 34],
+    "2ndColumn": [2, 5, 8, 11, 14, 17, 20, 23, 26, 29, 32, 35],
+    "3rdColumn": [3, 6, 9, 12, 15, 18, 21, 24, 27, 30, 33, 36],
+    "dozen1": list(range(1, 13)),
+    "dozen2": list(range(13, 25)),
+    "dozen3": list(range(25, 37))
+}
+list_registry = ListRegistry(list_file_path, DEFAULT_LISTS)
+
+
 # Load or initialize predefined lists
 def load_lists():
-    if os.path.exists(list_file_path):
-        with open(list_file_path, 'r') as file:
-            return json.load(file)
-    else:
-        return {
-            "Big": [22, 18, 29, 7, 28, 12, 35, 3, 26, 0, 32, 15, 19, 4, 21, 2, 25],
-            "Orph": [1, 20, 14, 31, 9, 17, 34, 6],
-            "Small": [27, 13, 36, 11, 30, 8, 23, 10, 5, 24, 16, 33],
-            "even": [2, 4, 6, 8, 10, 12, 14, 16, 18, 20, 22, 24, 26, 28, 30, 32, 34, 36],
-            "odd": [1, 3, 5, 7, 9, 11, 13, 15, 17, 19, 21, 23, 25, 27, 29, 31, 33, 35],
-            "red": [1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36],
-            "black": [2, 4, 6, 8, 10, 11, 13, 15, 17, 20, 22, 24, 26, 28, 29, 31, 33, 35],
-            "1-12": list(range(1, 13)),
-            "13-24": list(range(13, 25)),
-            "25-36": list(range(25, 37)),
-            "1stHalf": list(range(1, 19)),
-            "2ndHalf": list(range(19, 37)),
-            "1stColumn": [1, 4, 7, 10, 13, 16, 19, 22, 25, 28, 31, 34],
-            "2ndColumn": [2, 5, 8, 11, 14, 17, 20, 23, 26, 29, 32, 35],
-            "3rdColumn": [3, 6, 9, 12, 15, 18, 21, 24, 27, 30, 33, 36],
-            "dozen1": list(range(1, 13)),
-            "dozen2": list(range(13, 25)),
-            "dozen3": list(range(25, 37))
-
-        }
+    return list_registry.lists()
 def cross_list_follow_count(file_path, list_a, list_b, lists):
-    df = pd.read_csv(file_path)
-    numbers = df['Number'].tolist()
-    a_follows_b = 0
-    b_follows_a = 0
-    a_not_follows_b = 0
-    b_not_follows_a = 0
-
-    for i in range(len(numbers) - 1):
-        if numbers[i] in lists[list_a] and numbers[i + 1] in lists[list_b]:
-            a_follows_b += 1
-        elif numbers[i] in lists[list_a] and numbers[i + 1] not in lists[list_b]:
-            a_not_follows_b += 1
-        
-        if numbers[i] in lists[list_b] and numbers[i + 1] in lists[list_a]:
-            b_follows_a += 1
-        elif numbers[i] in lists[list_b] and numbers[i + 1] not in lists[list_a]:
-            b_not_follows_a += 1
-
+    pair = {list_a: lists[list_a], list_b: lists[list_b]}
+    follows, not_follows = follow_counts(transition_matrix(load_spins(file_path)), pair)
     return {
-        f"{list_a} follows {list_b}": a_follows_b,
-        f"{list_b} follows {list_a}": b_follows_a,
-        f"{list_a} does not follow {list_b}": a_not_follows_b,
-        f"{list_b} does not follow {list_a}": b_not_follows_a
+        f"{list_a} follows {list_b}": int(follows.loc[list_a, list_b]),
+        f"{list_b} follows {list_a}": int(follows.loc[list_b, list_a]),
+        f"{list_a} does not follow {list_b}": int(not_follows.loc[list_a, list_b]),
+        f"{list_b} does not follow {list_a}": int(not_follows.loc[list_b, list_a])
     }
 def save_lists(lists):
-    with open(list_file_path, 'w') as file:
-        json.dump(lists, file, indent=4)
+    list_registry.save(lists)
 
 def get_csv_files():
-    """Returns a list of csv files from the csv_directory."""
-    return glob.glob(os.path.join(csv_directory, '*.csv'))
+    """Returns a list of session files (CSV or .spins) from the csv_directory."""
+    return (glob.glob(os.path.join(csv_directory, '*.csv'))
+            + glob.glob(os.path.join(csv_directory, '*' + spin_format.SPINS_EXT)))
+class RunIndex:
+    """Maximal runs of ``predefined_list`` members in ``numbers``.
+
+    Runs are stored as parallel ``starts``/``ends`` offset arrays; ``ends`` is
+    exclusive and includes the number that broke the run, if any, so
+    ``index[i]`` is a zero-copy slice equal to the i-th ``get_subsequences``
+    entry.
+    """
+
+    def __init__(self, numbers, predefined_list):
+        # runs are slices of the caller's array; only the offsets are kept
+        self.numbers = np.asarray(numbers)
+        if not len(self.numbers):
+            self.starts = self.ends = self.lengths = np.empty(0, dtype=np.intp)
+            self.terminated = np.empty(0, dtype=bool)
+            return
+        values = self.numbers.astype(np.intp, copy=False)
+        valid = (values >= 0) & (values <= 36)
+        mask = lookup_vector(predefined_list)[np.where(valid, values, 0)] & valid
+        edges = np.diff(mask.astype(np.int8), prepend=0, append=0)
+        self.starts = np.flatnonzero(edges == 1)
+        run_ends = np.flatnonzero(edges == -1)
+        self.lengths = run_ends - self.starts
+        self.terminated = run_ends < len(self.numbers)
+        self.ends = run_ends + self.terminated
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, i):
+        return self.numbers[self.starts[i]:self.ends[i]]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def doubles(self):
+        """Boolean masks over runs: (successful, failed) doubles."""
+        return self.lengths >= 2, (self.lengths == 1) & self.terminated
+
+    def triples(self):
+        """Boolean masks over runs: (successful, failed) triples."""
+        return self.lengths >= 3, (self.lengths == 2) & self.terminated
+
+    def contexts(self):
+        """Offset of the number shown before each run, or -1 for none.
+
+        Matches ``get_subsequences_with_context``: only numbers seen outside a
+        run count, so the number that broke the previous run is skipped.
+        """
+        # a run that starts right where the previous one was broken shares
+        # its context, so look back to the first run of each such chain
+        chained = np.concatenate(([False], self.starts[1:] == self.ends[:-1]))
+        first = np.maximum.accumulate(np.where(chained, 0, np.arange(len(self))))
+        return self.starts[first] - 1
+
+    def with_context(self, i):
+        context = self.contexts()[i]
+        run = self[i].tolist()
+        return run if context < 0 else [self.numbers[context].item()] + run
+
+    def frame(self, selection=None):
+        """DataFrame of the selected runs, one per row, padded with NaN."""
+        starts, ends = self.starts, self.ends
+        if selection is not None:
+            starts, ends = starts[selection], ends[selection]
+        lengths = ends - starts
+        if not len(starts):
+            return pd.DataFrame()
+        width = lengths.max()
+        offsets = np.arange(width)
+        values = self.numbers[np.minimum(starts[:, None] + offsets, len(self.numbers) - 1)].astype(np.intp)
+        if (lengths == width).all():
+            return pd.DataFrame(values)
+        return pd.DataFrame(np.where(offsets < lengths[:, None], values, np.nan))
+
+
 def get_subsequences(predefined_list, numbers):
-    subsequences = []
-    in_sequence = False
-    current_sequence = []
-
-    for num in numbers:
-        if num in predefined_list:
-            if not in_sequence:
-                if current_sequence:
-                    subsequences.append(current_sequence)
-                current_sequence = []
-                in_sequence = True
-            current_sequence.append(num)
-        else:
-            if in_sequence:
-                current_sequence.append(num)
-                subsequences.append(current_sequence)
-                current_sequence = []
-                in_sequence = False
-            else:
-                if current_sequence:
-                    subsequences.append(current_sequence)
-                    current_sequence = []
+    return [run.tolist() for run in RunIndex(numbers, predefined_list)]
 
-    # Append the last sequence if it ends at the last element
-    if current_sequence:
-        subsequences.append(current_sequence)
 
-    return subsequences
-import pandas as pd
 def get_subsequences_with_context(predefined_list, numbers):
-    subsequences = []
-    in_sequence = False
-    current_sequence = []
-    previous_number = None
-
-    for num in numbers:
-        if num in predefined_list:
-            if not in_sequence:
-                # Start a new sequence with the previous number if it exists
-                if previous_number is not None:
-                    current_sequence = [previous_number]
-                else:
-                    current_sequence = []
-                in_sequence = True
-            current_sequence.append(num)
-        else:
-            if in_sequence:
-                # Continue the current sequence
-                current_sequence.append(num)
-                subsequences.append(current_sequence)
-                current_sequence = []
-                in_sequence = False
-            else:
-                # Reset the previous number if not currently in a sequence
-                previous_number = num
+    index = RunIndex(numbers, predefined_list)
+    contexts = index.contexts()
+    return [([index.numbers[c].item()] if c >= 0 else []) + run.tolist()
+            for c, run in zip(contexts, index)]
+
+
+def in_lookup(lookup, num):
+    """``num in list`` through the list's 37-long lookup vector."""
+    return isinstance(num, (int, np.integer)) and 0 <= num <= 36 and bool(lookup[num])
 
-    # Append the last sequence if it ends at the last element
-    if current_sequence:
-        subsequences.append(current_sequence)
 
-    return subsequences
 def count_list_occurrences(subsequences, list_one, list_two, list_one_name='list_one', list_two_name='list_two'):
+    lookup_one, lookup_two = lookup_vector(list_one), lookup_vector(list_two)
     # Initialize counters
     counts = {
         f'{list_one_name} first, {list_two_name} second': 0,
@@ -147,10 +181,10 @@ def count_list_occurrences(subsequences, list_one, list_two, list_one_name='list
             continue  # Skip subsequences that don't have at least two numbers
 
         # Check membership of the first and second numbers in the lists
-        first_in_one = subseq[0] in list_one
-        first_in_two = subseq[0] in list_two
-        second_in_one = subseq[1] in list_one
-        second_in_two = subseq[1] in list_two
+        first_in_one = in_lookup(lookup_one, subseq[0])
+        first_in_two = in_lookup(lookup_two, subseq[0])
+        second_in_one = in_lookup(lookup_one, subseq[1])
+        second_in_two = in_lookup(lookup_two, subseq[1])
 
         # Update the counters based on memberships
         if first_in_one and second_in_two:
@@ -164,6 +198,13 @@ def count_list_occurrences(subsequences, list_one, list_two, list_one_name='list
 
 # Example usage
 def categorize_subsequences(subsequences, predefined_list):
+    if isinstance(subsequences, RunIndex):
+        successful, failed = subsequences.doubles()
+        successful_3, failed_3 = subsequences.triples()
+        return tuple([subsequences[i].tolist() for i in np.flatnonzero(selection)]
+                     for selection in (successful, failed, successful_3, failed_3))
+
+    lookup = lookup_vector(predefined_list)
     successful_doubles = []
     failed_doubles = []
     successful_triples = []
@@ -172,12 +213,12 @@ def categorize_subsequences(subsequences, predefined_list):
 
     for seq in subsequences:
         if len(seq) >= 2:
-            if seq[0] in predefined_list and seq[1] in predefined_list:
+            if in_lookup(lookup, seq[0]) and in_lookup(lookup, seq[1]):
                 successful_doubles.append(seq)
             else:
                 failed_doubles.append(seq)
         if len(seq) >= 3:
-            if seq[0] in predefined_list and seq[1] in predefined_list and seq[2] in predefined_list:
+            if all(in_lookup(lookup, num) for num in seq[:3]):
                 successful_triples.append(seq)
             else:
                 failed_triples.append(seq)
@@ -185,16 +226,16 @@ def categorize_subsequences(subsequences, predefined_list):
     return successful_doubles, failed_doubles, successful_triples, failed_triples
 
 def analyze_and_extract_sequences(file_path, lists):
-    df = pd.read_csv(file_path)
-    numbers = df['Number'].tolist()
+    numbers = load_spins(file_path).tolist()
     
     stats = {name: {} for name in lists.keys()}
 
     for list_name, predefined_list in lists.items():
-        subsequences = get_subsequences(predefined_list, numbers)
-        
+        index = RunIndex(numbers, predefined_list)
+        subsequences = [run.tolist() for run in index]
+
         # Unpack categorized sequences
-        successful_doubles, failed_doubles, successful_triples, failed_triples = categorize_subsequences(subsequences, predefined_list)
+        successful_doubles, failed_doubles, successful_triples, failed_triples = categorize_subsequences(index, predefined_list)
         
         # Store results in stats dictionary
         stats[list_name]['successful_doubles'] = successful_doubles
@@ -208,57 +249,537 @@ def analyze_and_extract_sequences(file_path, lists):
     return stats, numbers
 
 
-import pandas as pd
-
 def neighbors_count(file_path, circular_list, num_neighbors):
-    df = pd.read_csv(file_path)
-    numbers = df['Number'].tolist()
-    
-    # Initialize counters
-    match_count = 0
-    no_match_count = 0
-    
-    # Precompute neighbors for each index in the circular list
-    total_numbers = len(circular_list)
-    neighbors_dict = {}
-    for index in range(total_numbers):
-        neighbors = set()
-        for offset in range(1, num_neighbors + 1):
-            neighbors.add(circular_list[(index - offset) % total_numbers])
-            neighbors.add(circular_list[(index + offset) % total_numbers])
-        neighbors_dict[circular_list[index]] = neighbors
-
-    # Process each pair of consecutive numbers
-    for current_number, next_number in zip(numbers, numbers[1:]):
-        if current_number in neighbors_dict:
-            # Check if the next number is one of the current number's neighbors
-            if next_number in neighbors_dict[current_number]:
-                match_count += 1
-            else:
-                no_match_count += 1
-        else:
-            no_match_count += 1
+    _, curve = neighbor_curve(load_spins(file_path), circular_list)
+    return neighbors_at(curve, num_neighbors)
 
-    return match_count, no_match_count
 
+def count_numbers_by_list(file_path, lists):
+    hits = list_hits(load_spins(file_path), lists)
+    return dict(zip(lists.keys(), hits.sum(axis=0).tolist()))
 
 
+def load_spins(file_path):
+    """Spins of a Number CSV or ``.spins`` file as a uint8 array (memory-mapped for ``.spins``)."""
+    return spin_format.load_numbers(file_path)
 
 
-def count_numbers_by_list(file_path, lists):
-    df = pd.read_csv(file_path)
-    counts = {name: 0 for name in lists.keys()}
-    for num in df['Number']:
-        for list_name, numbers in lists.items():
-            if num in numbers:
-                counts[list_name] += 1
-    return counts
+def membership_matrix(lists):
+    """37xL boolean matrix; column j marks the numbers of the j-th list."""
+    matrix = np.zeros((37, len(lists)), dtype=bool)
+    for j, numbers in enumerate(lists.values()):
+        matrix[:, j] = lookup_vector(numbers)
+    return matrix
+
+
+def list_hits(numbers, lists):
+    """(spins x lists) boolean mask of which lists each spin belongs to."""
+    numbers = np.asarray(numbers)
+    valid = (numbers >= 0) & (numbers <= 36)
+    return membership_matrix(lists)[np.where(valid, numbers, 0)] & valid[:, None]
+
+
+def wheel_distance_table(circular_list=WHEEL_LAYOUT):
+    """37x37 signed steps round the wheel from number ``i`` to number ``j``.
+
+    Distances fall in ``-(n-1)//2 .. n//2`` for a wheel of ``n`` pockets;
+    numbers missing from ``circular_list`` get a distance no ``k`` reaches.
+    """
+    total_numbers = len(circular_list)
+    position = np.full(37, -1)
+    position[circular_list] = np.arange(total_numbers)
+    steps = (position[None, :] - position[:, None]) % total_numbers
+    signed = np.where(steps > total_numbers // 2, steps - total_numbers, steps)
+    missing = position < 0
+    return np.where(missing[:, None] | missing[None, :], 37, signed)
+
+
+def neighbor_curve(numbers, circular_list=WHEEL_LAYOUT):
+    """Wheel distance between consecutive spins, for every ``k`` at once.
+
+    Returns the signed-distance histogram (a Series indexed by distance) and
+    a DataFrame indexed by ``k = 1 .. n//2`` with the Matches/Non-matches
+    ``neighbors_count`` would give for that many neighbours on each side.
+    """
+    numbers = np.asarray(numbers, dtype=np.intp)
+    total_numbers = len(circular_list)
+    low, high = -((total_numbers - 1) // 2), total_numbers // 2
+    valid = (numbers >= 0) & (numbers <= 36)
+    pairs = np.where(valid, numbers, 0)
+    distance = wheel_distance_table(circular_list)[pairs[:-1], pairs[1:]]
+    distance = distance[valid[:-1] & valid[1:] & (distance != 37)]
+    histogram = np.bincount(distance - low, minlength=high - low + 1)
+    histogram = pd.Series(histogram, index=pd.RangeIndex(low, high + 1, name='Distance'), name='Count')
+    by_size = np.bincount(np.abs(distance), minlength=high + 1)
+    matches = np.cumsum(by_size[1:])
+    curve = pd.DataFrame({
+        'Matches': matches,
+        'Non-matches': max(len(numbers) - 1, 0) - matches,
+    }, index=pd.RangeIndex(1, high + 1, name='Neighbors'))
+    return histogram, curve
+
+
+def neighbors_at(curve, num_neighbors):
+    """(match, no_match) for ``num_neighbors`` looked up on a neighbour curve."""
+    if num_neighbors < 1:
+        return 0, int(curve['Matches'].iloc[0] + curve['Non-matches'].iloc[0])
+    row = curve.loc[min(num_neighbors, curve.index[-1])]
+    return int(row['Matches']), int(row['Non-matches'])
+
+
+def transition_matrix(numbers):
+    """37x37 counts of spin ``i`` being immediately followed by spin ``j``."""
+    numbers = np.asarray(numbers, dtype=np.intp)
+    current, following = numbers[:-1], numbers[1:]
+    valid = (current >= 0) & (current <= 36) & (following >= 0) & (following <= 36)
+    transitions = np.zeros((37, 37), dtype=np.int64)
+    np.add.at(transitions, (current[valid], following[valid]), 1)
+    return transitions
+
+
+def follow_counts(transitions, lists):
+    """LxL tables of how often a number of the row list is followed by one
+    that is (``follows``) or is not (``not_follows``) in the column list."""
+    members = membership_matrix(lists).astype(np.int64)
+    follows = members.T @ transitions @ members
+    not_follows = members.T @ transitions @ (1 - members)
+    names = pd.Index(list(lists.keys()))
+    return (pd.DataFrame(follows, index=names, columns=names),
+            pd.DataFrame(not_follows, index=names, columns=names))
+
+
+def file_digest(path):
+    """Return the SHA-1 of a file's contents."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def array_digest(spins):
+    """Return the SHA-1 of a spin array that didn't come from a file."""
+    return hashlib.sha1(np.ascontiguousarray(spins, dtype=np.uint8).tobytes()).hexdigest()
+
+
+def list_key(lists):
+    """Hashable form of a ``{name: numbers}`` selection for cache keys."""
+    return tuple((name, tuple(numbers)) for name, numbers in lists.items())
+
+
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if hasattr(value, '__dict__'):
+        return _nbytes(vars(value))
+    return sys.getsizeof(value)
+
+
+class AnalysisCache:
+    """LRU cache of parsed spin files and analysis results.
+
+    Files are identified by path, size and mtime, and results are keyed by
+    the SHA-1 of the file contents, so re-uploading an identical file still
+    hits.  Entries are evicted least recently used first once they hold more
+    than ``max_bytes``.  With a ``directory`` results are also pickled there
+    and read back after a restart; the oldest files are deleted once the
+    folder holds more than ``disk_bytes``.  One instance is shared by every
+    session thread, so lookups and stores hold a lock (computing a missing
+    result does not).
+    """
+
+    def __init__(self, max_bytes=ANALYSIS_CACHE_BYTES, directory=None,
+                 disk_bytes=ANALYSIS_CACHE_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.disk_bytes = disk_bytes
+        self.entries = OrderedDict()
+        self.digests = {}
+        self.nbytes = 0
+        self.lock = threading.RLock()
+
+    def digest(self, path):
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            if key in self.digests:
+                return self.digests[key]
+        digest = file_digest(path)
+        with self.lock:
+            self.digests = {k: v for k, v in self.digests.items() if k[0] != key[0]}
+            self.digests[key] = digest
+        return digest
+
+    def load_spins(self, path):
+        """Return ``(digest, spins)``, parsing the file only when it changed."""
+        digest = self.digest(path)
+        return digest, self.get(digest, 'spins', lambda: load_spins(path))
+
+    def _disk_path(self, key):
+        name = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, name + '.pkl')
+
+    def _put(self, key, value):
+        size = _nbytes(value)
+        self.entries[key] = (value, size)
+        self.nbytes += size
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, old) = self.entries.popitem(last=False)
+            self.nbytes -= old
+
+    def _prune_disk(self):
+        """Delete the least recently used pickles beyond ``disk_bytes``."""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pkl'):
+                stat = entry.stat()
+                files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def lookup(self, digest, name, *args):
+        """Return the cached result for ``(digest, name, args)`` or ``None``."""
+        key = (digest, name) + args
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key][0]
+            if self.directory and os.path.exists(self._disk_path(key)):
+                try:
+                    with open(self._disk_path(key), 'rb') as f:
+                        value = pickle.load(f)
+                    # the file's mtime is its last use for _prune_disk
+                    os.utime(self._disk_path(key))
+                except FileNotFoundError:
+                    return None
+                self._put(key, value)
+                return value
+        return None
+
+    def store(self, digest, name, value, *args):
+        key = (digest, name) + args
+        with self.lock:
+            if self.directory:
+                os.makedirs(self.directory, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(value, f)
+                os.replace(tmp, self._disk_path(key))
+                self._prune_disk()
+            self._put(key, value)
+        return value
+
+    def get(self, digest, name, compute, *args):
+        """Return ``compute()`` for file ``digest``, cached under ``(name, args)``."""
+        value = self.lookup(digest, name, *args)
+        if value is None:
+            value = self.store(digest, name, compute(), *args)
+        return value
+
+
+@st.cache_resource
+def analysis_cache():
+    """One cache shared by every rerun and session of the app."""
+    return AnalysisCache(directory=ANALYSIS_CACHE_DIR)
+
+
+@st.cache_resource
+def session_catalog():
+    return session_db.connect(check_same_thread=False)
+
+
+def list_kernel(numbers, lists, circular_list=None, num_neighbors=6):
+    """Counts, runs, doubles/triples and neighbour hits for all lists at once.
+
+    ``numbers`` is the spin array from :func:`load_spins`.  Returns a
+    DataFrame indexed by list name, with the same double/triple tallies
+    ``categorize_subsequences`` gives, and the ``(match, no_match)`` counts of
+    ``neighbors_count`` (``None`` without a ``circular_list``).
+    """
+    numbers = np.asarray(numbers)
+    hits = list_hits(numbers, lists)
+    n = len(numbers)
+    prev = np.zeros_like(hits)
+    prev[1:] = hits[:-1]
+    starts = hits & ~prev
+    runs = starts.sum(axis=0)
+    runs_2 = (starts[:-1] & hits[1:]).sum(axis=0)
+    runs_3 = (starts[:-2] & hits[1:-1] & hits[2:]).sum(axis=0)
+    # a run reaching the last spin has no closing number, so it can't fail
+    open_len = np.zeros(len(lists), dtype=int)
+    if n:
+        open_len = np.where(hits[-1], 1, 0)
+        if n >= 2:
+            open_len += hits[-1] & hits[-2]
+        if n >= 3:
+            open_len += hits[-1] & hits[-2] & hits[-3]
+    table = pd.DataFrame({
+        'Count': hits.sum(axis=0),
+        'Runs': runs,
+        'Successful Doubles': runs_2,
+        'Failed Doubles': runs - runs_2 - (open_len == 1),
+        'Successful Triples': runs_3,
+        'Failed Triples': runs_2 - runs_3 - (open_len == 2),
+    }, index=pd.Index(list(lists.keys()), name='List'))
+    table['Total Doubles'] = table['Successful Doubles'] + table['Failed Doubles']
+    table['Total Triples'] = table['Successful Triples'] + table['Failed Triples']
+
+    neighbors = None
+    if circular_list is not None:
+        neighbors = neighbors_at(neighbor_curve(numbers, circular_list)[1], num_neighbors)
+    return table, neighbors
+
+def analyze_file(file_path, lists):
+    """List table, transition matrix and wheel-distance histogram of one file."""
+    spins = load_spins(file_path)
+    histogram, _ = neighbor_curve(spins)
+    return list_kernel(spins, lists)[0], transition_matrix(spins), histogram
+
+
+def analyze_corpus(files, lists, cache=None, workers=None):
+    """Run ``analyze_file`` on every session file, in parallel.
+
+    Files already in ``cache`` are not recomputed.  Returns a dict with the
+    per-file tables (indexed by File and List), pooled ``totals`` per list,
+    ``machines`` totals per machine and list, and the pooled ``transitions``
+    and ``histogram``.
+    """
+    if not files:
+        raise ValueError('No session files to analyze')
+    cache = cache if cache is not None else AnalysisCache()
+    key = list_key(lists)
+    digests = {path: cache.digest(path) for path in files}
+    results = {path: cache.lookup(digest, 'corpus_file', key) for path, digest in digests.items()}
+    missing = [path for path, result in results.items() if result is None]
+    if len(missing) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            computed = list(pool.map(analyze_file, missing, [lists] * len(missing)))
+    else:
+        computed = [analyze_file(path, lists) for path in missing]
+    for path, result in zip(missing, computed):
+        results[path] = cache.store(digests[path], 'corpus_file', result, key)
+
+    per_file = pd.concat({path: result[0] for path, result in results.items()}, names=['File'])
+    columns = list(per_file.columns)
+    per_file.insert(0, 'Machine', [machine_name(path) for path in per_file.index.get_level_values('File')])
+    return {
+        'files': per_file,
+        'totals': per_file.groupby(level='List', sort=False)[columns].sum(),
+        'machines': per_file.groupby(['Machine', 'List'], sort=False)[columns].sum(),
+        'transitions': sum(result[1] for result in results.values()),
+        'histogram': pd.concat([result[2] for result in results.values()], axis=1).sum(axis=1),
+    }
+
+
+class IncrementalAnalyzer:
+    """List, run, transition and neighbour statistics updated one spin at a time.
+
+    ``push`` and ``pop`` cost O(lists), so a live session never recomputes
+    from the whole file.  ``table()`` matches ``list_kernel`` and
+    ``neighbor_curve()`` matches the function of the same name for the spins
+    pushed so far.  ``save``/``load`` keep the counters in a sidecar ``.npz``
+    and the spins in an append-only ``.log`` next to it (one byte per spin),
+    so saving after a few pushes or pops writes O(lists) bytes.
+    """
+
+    def __init__(self, lists, circular_list=WHEEL_LAYOUT):
+        self.lists = dict(lists)
+        self.circular_list = list(circular_list)
+        self.members = membership_matrix(self.lists)
+        self.distances = wheel_distance_table(self.circular_list)
+        self.low = -((len(self.circular_list) - 1) // 2)
+        size = len(self.lists)
+        self.history = []
+        # leading spins of history already in the spin log on disk
+        self.logged = 0
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.run_length = np.zeros(size, dtype=np.int64)
+        self.runs = np.zeros((3, size), dtype=np.int64)
+        self.transitions = np.zeros((37, 37), dtype=np.int64)
+        self.histogram = np.zeros(len(self.circular_list), dtype=np.int64)
+
+    def __len__(self):
+        return len(self.history)
+
+    def _hits(self, num):
+        if 0 <= num <= 36:
+            return self.members[num]
+        return np.zeros(len(self.lists), dtype=bool)
+
+    def _pair(self, last, num, step):
+        if 0 <= last <= 36 and 0 <= num <= 36:
+            self.transitions[last, num] += step
+            distance = self.distances[last, num]
+            if distance != 37:
+                self.histogram[distance - self.low] += step
+
+    def push(self, num):
+        num = int(num)
+        hits = self._hits(num)
+        previous = self.run_length
+        # a run of length >= 1, 2, 3 starts, becomes a double, becomes a triple
+        self.runs += hits & (previous[None, :] == np.arange(3)[:, None])
+        self.counts += hits
+        self.run_length = np.where(hits, previous + 1, 0)
+        if self.history:
+            self._pair(self.history[-1], num, 1)
+        self.history.append(num)
+
+    def _runs_before_last(self, lists):
+        """Run length of the selected lists just before the last spin.
+
+        Walks back only until each of them missed, which is a few spins
+        unless a list holds nearly every number.
+        """
+        runs = np.zeros(len(self.lists), dtype=np.int64)
+        open_runs = lists.copy()
+        for num in reversed(self.history[:-1]):
+            if not open_runs.any():
+                break
+            open_runs &= self._hits(num)
+            runs += open_runs
+        return runs
+
+    def pop(self):
+        """Undo the last ``push`` and return the spin it removed."""
+        num = self.history[-1]
+        hits = self._hits(num)
+        previous = np.where(hits, self.run_length - 1, self._runs_before_last(~hits))
+        self.history.pop()
+        self.logged = min(self.logged, len(self.history))
+        self.runs -= hits & (previous[None, :] == np.arange(3)[:, None])
+        self.counts -= hits
+        self.run_length = previous
+        if self.history:
+            self._pair(self.history[-1], num, -1)
+        return num
+
+    def table(self):
+        runs, runs_2, runs_3 = self.runs
+        table = pd.DataFrame({
+            'Count': self.counts,
+            'Runs': runs,
+            'Successful Doubles': runs_2,
+            'Failed Doubles': runs - runs_2 - (self.run_length == 1),
+            'Successful Triples': runs_3,
+            'Failed Triples': runs_2 - runs_3 - (self.run_length == 2),
+        }, index=pd.Index(list(self.lists.keys()), name='List'))
+        table['Total Doubles'] = table['Successful Doubles'] + table['Failed Doubles']
+        table['Total Triples'] = table['Successful Triples'] + table['Failed Triples']
+        return table
+
+    def neighbor_curve(self):
+        high = len(self.circular_list) // 2
+        histogram = pd.Series(self.histogram.copy(), index=pd.RangeIndex(self.low, high + 1, name='Distance'),
+                              name='Count')
+        by_size = np.bincount(np.abs(np.arange(self.low, high + 1)), weights=self.histogram,
+                              minlength=high + 1).astype(np.int64)
+        matches = np.cumsum(by_size[1:])
+        curve = pd.DataFrame({
+            'Matches': matches,
+            'Non-matches': max(len(self.history) - 1, 0) - matches,
+        }, index=pd.RangeIndex(1, high + 1, name='Neighbors'))
+        return histogram, curve
+
+    @staticmethod
+    def log_path(path):
+        return os.path.splitext(path)[0] + '.log'
+
+    def save(self, path):
+        """Bring the spin log up to date, then write the counters to ``path``.
+
+        The counters record how many spins they cover, so a log left longer
+        by an interrupted save is cut back on the next load.
+        """
+        mode = 'r+b' if os.path.exists(self.log_path(path)) else 'wb'
+        with open(self.log_path(path), mode) as f:
+            f.truncate(self.logged)
+            f.seek(self.logged)
+            f.write(np.array(self.history[self.logged:], dtype=np.uint8).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self.logged = len(self.history)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, lists=np.array(json.dumps({k: list(v) for k, v in self.lists.items()})),
+                     circular_list=self.circular_list, spins=len(self.history),
+                     counts=self.counts, run_length=self.run_length, runs=self.runs,
+                     transitions=self.transitions, histogram=self.histogram)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, lists, circular_list=WHEEL_LAYOUT):
+        """Restore a saved state, or ``None`` if it was built for other lists."""
+        with np.load(path) as data:
+            if json.loads(data['lists'].item()) != {k: list(v) for k, v in lists.items()}:
+                return None
+            if data['circular_list'].tolist() != list(circular_list):
+                return None
+            analyzer = cls(lists, circular_list)
+            count = int(data['spins'])
+            for name in ('counts', 'run_length', 'runs', 'transitions', 'histogram'):
+                setattr(analyzer, name, data[name])
+        with open(cls.log_path(path), 'rb') as f:
+            history = np.frombuffer(f.read(count), dtype=np.uint8)
+        if len(history) < count:
+            return None
+        analyzer.history = history.tolist()
+        analyzer.logged = count
+        return analyzer
+
+    @classmethod
+    def for_file(cls, file_path, lists, circular_list=WHEEL_LAYOUT):
+        """Analyzer for a session file, resumed from its sidecar if present.
+
+        Only spins that differ from the saved history are popped or pushed,
+        and the sidecar is rewritten when anything changed.
+        """
+        sidecar = os.path.splitext(file_path)[0] + '.analysis.npz'
+        analyzer = None
+        if os.path.exists(sidecar):
+            try:
+                analyzer = cls.load(sidecar, lists, circular_list)
+            except (OSError, ValueError, KeyError):
+                analyzer = None
+        if analyzer is None:
+            analyzer = cls(lists, circular_list)
+        spins = load_spins(file_path)
+        saved = np.array(analyzer.history, dtype=np.int64)
+        common = min(len(saved), len(spins))
+        differs = np.flatnonzero(saved[:common] != spins[:common])
+        keep = differs[0] if len(differs) else common
+        if keep == len(saved) == len(spins) and os.path.exists(sidecar):
+            return analyzer
+        while len(analyzer) > keep:
+            analyzer.pop()
+        for num in spins[keep:]:
+            analyzer.push(num)
+        analyzer.save(sidecar)
+        return analyzer
+
 
 def app():
     st.title('Analysis of Number Sequences')
 
     # Load or initialize lists
     lists = load_lists()
+    for problem in list_registry.problems:
+        st.warning(problem)
 
     # Manage lists section
     with st.expander("Manage Lists"):
@@ -298,7 +819,7 @@ def app():
                 st.success(f"List '{delete_list_name}' deleted successfully.")
 
     # File upload functionality
-    uploaded_file = st.file_uploader("Upload a CSV file for analysis", type=['csv'])
+    uploaded_file = st.file_uploader("Upload a CSV file for analysis", type=['csv', 'spins'])
     if uploaded_file is not None:
         file_path = os.path.join(csv_directory, uploaded_file.name)
         with open(file_path, "wb") as f:
@@ -307,7 +828,17 @@ def app():
 
     # Select CSV file for analysis
     existing_files = get_csv_files()
-    selected_file = st.selectbox('Or select an existing CSV file:', existing_files)
+    use_catalog = os.path.exists(session_db.DB_PATH) and st.checkbox(
+        "Use the session catalog", help="Analyse every spin on one machine over a date range")
+    if use_catalog:
+        machine = st.selectbox('Machine:', session_db.list_machines(session_catalog()))
+        start = st.date_input('Sessions started from:', value=None)
+        end = st.date_input('Up to and including:', value=None)
+        end = end + pd.Timedelta(days=1) if end else None
+        # stands in for a file name in the rest of the page
+        selected_file = f"catalog {machine} {start or ''} {end or ''}" if machine else None
+    else:
+        selected_file = st.selectbox('Or select an existing CSV file:', existing_files)
 
     # User selects which lists to analyze
     list_selection = st.multiselect("Select number lists to analyze:", list(lists.keys()))
@@ -319,87 +850,144 @@ def app():
     if 'selected_lists' in st.session_state and st.session_state.selected_lists:
         selected_lists = {name: lists[name] for name in st.session_state.selected_lists}
         if st.button('Show Analysis') and selected_file:
-            counts = count_numbers_by_list(selected_file, selected_lists)
-            data = pd.DataFrame({
-                "List": list(selected_lists.keys()),
-                "Count": [counts[name] for name in selected_lists]
-            })
+            st.session_state.analysis_file = selected_file
+        if selected_file and st.session_state.get('analysis_file') == selected_file:
+            cache = analysis_cache()
+            if use_catalog:
+                spins = session_db.machine_spins(session_catalog(), machine, start, end)
+                digest = array_digest(spins)
+                if not len(spins):
+                    st.warning("No spins on this machine in that date range.")
+            else:
+                digest, spins = cache.load_spins(selected_file)
+            lists_key = list_key(selected_lists)
+            table = cache.get(digest, 'list_kernel', lambda: list_kernel(spins, selected_lists)[0], lists_key)
+            # the curve covers every neighbour count, so the input is only a lookup
+            histogram, curve = cache.get(digest, 'neighbor_curve', lambda: neighbor_curve(spins, WHEEL_LAYOUT),
+                                         tuple(WHEEL_LAYOUT))
+            match_count, no_match_count = neighbors_at(curve, num_neighbors)
+            data = table['Count'].reset_index()
+            if not use_catalog and st.checkbox("Live session", key="live_session",
+                           help="Follow a file that is still being logged, updating only for new spins"):
+                analyzer = IncrementalAnalyzer.for_file(selected_file, selected_lists)
+                st.write(f"Spins tracked: {len(analyzer)}")
+                st.write(analyzer.table())
             st.info(f"neighbors {num_neighbors}")
-            circular_list = [0, 32, 15, 19, 4, 21, 2, 25, 17, 34, 6, 27, 13, 36, 11, 30, 8, 23, 10, 5, 24, 16, 33, 1, 20, 14, 31, 9, 22, 18, 29, 7, 28, 12, 35, 3, 26]
-            match_count, no_match_count = neighbors_count(selected_file, circular_list, num_neighbors)
-            st.write(f"Matches: {match_count}, Non-matches:{no_match_count}")    
+            st.write(f"Matches: {match_count}, Non-matches:{no_match_count}")
+            with st.expander("Neighbour curve"):
+                curve_data = curve.reset_index()
+                curve_data['Match %'] = curve_data['Matches'] / max(len(spins) - 1, 1) * 100
+                curve_data['Expected %'] = curve_data['Neighbors'] * 2 / 37 * 100
+                fig = px.line(curve_data, x='Neighbors', y=['Match %', 'Expected %'], markers=True,
+                              title="Next spin within k pockets of the last one")
+                fig.add_vline(x=num_neighbors, line_dash='dash')
+                st.plotly_chart(fig)
+                fig = px.bar(histogram.reset_index(), x='Distance', y='Count',
+                             title="Signed wheel distance between consecutive spins")
+                st.plotly_chart(fig)
             data_pivot = data.melt(id_vars=["List"], value_vars=["Count"])
             fig = px.bar(data_pivot, x='variable', y='value', color='List', title="Number Distribution Across Lists",
                          barmode='stack', color_discrete_sequence=px.colors.qualitative.Set1)
             fig.update_layout(yaxis_title="Total Counts", xaxis_title="Lists")
             st.plotly_chart(fig)
-
-            results, raw_numbers = analyze_and_extract_sequences(selected_file, selected_lists)
+            with st.expander("Rolling hit rates"):
+                window_text = st.text_input("Window sizes", value="18, 37, 111")
+                windows = tuple(int(w) for w in window_text.replace(',', ' ').split() if w.isdigit() and int(w) > 0)
+                span = st.number_input("EWMA span (0 for none)", min_value=0, max_value=1000, value=37)
+                z = st.number_input("Hot/cold band (standard errors)", min_value=0.5, max_value=5.0, value=2.0, step=0.5)
+                rates = rolling.rate_frame(spins, selected_lists, windows, int(span), z)
+                fig = px.line(rates, x='Spin', y='Rate', color='List', line_dash='Series',
+                              title="Hit rate over the session (%)")
+                st.plotly_chart(fig)
+                if windows:
+                    st.write(f"Last {windows[0]} spins:", rolling.hot_cold(spins, selected_lists, windows[0], z))
+            with st.expander("Significance"):
+                st.write("Hit counts against len(list)/37:")
+                st.write(significance.list_hit_tests(spins, selected_lists))
+                stat, p_value = significance.wheel_chi_square(spins)
+                st.write(f"All numbers equally likely: chi-square {stat:.2f}, p = {p_value:.4f}")
+                permutations = st.number_input("Shuffles", min_value=100, max_value=100000, value=10000, step=1000)
+                if st.checkbox("Run permutation tests", key="permutation_tests"):
+                    runs, follows = cache.get(digest, 'permutation_test', lambda: significance.permutation_test(
+                        spins, selected_lists, int(permutations), seed=0), lists_key, int(permutations))
+                    st.write("Runs per list against shuffled sessions:")
+                    st.write(runs)
+                    st.write("Follow count p-values (row list followed by column list):")
+                    st.write(follows)
+
+            raw_numbers = spins.tolist()
             st.subheader("Raw Sequence of Numbers:")
             st.write(raw_numbers)
-            for list_name, stats in results.items():
+            for list_name, predefined_list in selected_lists.items():
+                row = table.loc[list_name]
+                index = cache.get(digest, 'run_index', lambda: RunIndex(spins, predefined_list), tuple(predefined_list))
                 st.subheader(f"List: {list_name}")
                 with st.expander("Show sequences"):
-                    st.write("Sequences:", stats['all_sequences'])
-                    
-                st.write(f"Total Doubles: {stats['total_doubles']}")
-                st.write(f"Total Triples: {stats['total_triples']}")
-                st.write(f"Successful Doubles: {len(stats['successful_doubles'])}")
-                st.write(f"Failed Doubles: {len(stats['failed_doubles'])}")
-                st.write(f"Successful Triples: {len(stats['successful_triples'])}")
-                st.write(f"Failed Triples: {len(stats['failed_triples'])}")
+                    if st.checkbox("Load sequences", key=f"seq_{list_name}"):
+                        st.write("Sequences:", index.frame())
+                with st.expander("Show sequences with context"):
+                    if st.checkbox("Load sequences with context", key=f"context_{list_name}"):
+                        st.write(cache.get(digest, 'context', lambda: pd.DataFrame(
+                            get_subsequences_with_context(predefined_list, spins)), tuple(predefined_list)))
+
+                st.write(f"Total Doubles: {row['Total Doubles']}")
+                st.write(f"Total Triples: {row['Total Triples']}")
+                st.write(f"Successful Doubles: {row['Successful Doubles']}")
+                st.write(f"Failed Doubles: {row['Failed Doubles']}")
+                st.write(f"Successful Triples: {row['Successful Triples']}")
+                st.write(f"Failed Triples: {row['Failed Triples']}")
                 # show above in table with percentages
+                doubles = max(row['Total Doubles'], 1)
+                triples = max(row['Total Triples'], 1)
                 data = pd.DataFrame({
                     "Metric": ["% Successful Doubles", "% Failed Doubles", "% Successful Triples", "% Failed Triples"],
-                    "Percentage": [len(stats['successful_doubles']) / stats['total_doubles'] * 100, len(stats['failed_doubles']) / stats['total_doubles'] * 100, len(stats['successful_triples']) / stats['total_triples'] * 100, len(stats['failed_triples']) / stats['total_triples'] * 100]
+                    "Percentage": [row['Successful Doubles'] / doubles * 100, row['Failed Doubles'] / doubles * 100, row['Successful Triples'] / triples * 100, row['Failed Triples'] / triples * 100]
                 })
                 fig = px.bar(data, x='Metric', y='Percentage', title=f"Percentages for {list_name}")
                 st.plotly_chart(fig)
-                with st.expander("Show Successful Doubles"):
-                    st.write(pd.DataFrame(stats['successful_doubles']))
-                with st.expander("Show Failed Doubles"):
-                    st.write(pd.DataFrame(stats['failed_doubles']))
-                with st.expander("Show Successful Triples"):
-                    st.write(pd.DataFrame(stats['successful_triples']))
-                with st.expander("Show Failed Triples"):
-                    st.write(pd.DataFrame(stats['failed_triples']))
+                successful_doubles, failed_doubles = index.doubles()
+                successful_triples, failed_triples = index.triples()
+                for title, selection in [("Successful Doubles", successful_doubles), ("Failed Doubles", failed_doubles),
+                                         ("Successful Triples", successful_triples), ("Failed Triples", failed_triples)]:
+                    with st.expander(f"Show {title}"):
+                        # tables are built from the run index only once asked for
+                        if st.checkbox(f"Load {title.lower()}", key=f"{title}_{list_name}"):
+                            st.write(index.frame(selection))
 
                 # Visualization of counts
                 data = pd.DataFrame({
                     "Metric": ["Consecutive Doubles", "Failed Doubles", "Consecutive Triples", "Failed Triples"],
-                    "Count": [len(stats['successful_doubles']), len(stats['failed_doubles']), len(stats['successful_triples']), len(stats['failed_triples'])]
+                    "Count": [row['Successful Doubles'], row['Failed Doubles'], row['Successful Triples'], row['Failed Triples']]
                 })
                 fig = px.bar(data, x='Metric', y='Count', title=f"Counts for {list_name}")
                 st.plotly_chart(fig)
 
-            # create list of pairs from lists
-            pairs_list = []
-            for i in range(len(selected_lists)):
-                for j in range(i + 1, len(selected_lists)):
-                    pairs_list.append((list(selected_lists.keys())[i], list(selected_lists.keys())[j]))
-            #list_pairs = [("Big", "Small"), ("Big", "Orph"), ("Small", "Orph")]
-            # for pair in list_pairs:
-            #     results = cross_list_follow_count(selected_file, pair[0], pair[1], lists)
-            #     st.write(pair)
-            #     for k, v in results.items():
-            #         st.write(f"{k}: {v}")
-            for pair in pairs_list:
-                results_pair1 = get_subsequences_with_context(selected_lists[pair[0]], raw_numbers)
-                results_pair2 = get_subsequences_with_context(selected_lists[pair[1]], raw_numbers)
-                with st.expander(f"subsequences for {pair[0]} and {pair[1]}"):
-                    st.write(pd.DataFrame(results_pair1))
-
-                with st.expander(f"subsequences for {pair[1]} and {pair[0]}"):
-                    st.write(pd.DataFrame(results_pair2))
-
-                counts = count_list_occurrences(results_pair1, selected_lists[pair[0]], selected_lists[pair[1]], pair[0], pair[1])
-                st.info(f"Counts for {pair[0]} and {pair[1]}")
-                # make a table for this
-                st.write(pd.DataFrame(counts.items()).rename(columns={0: "Sequence", 1: "Count"}))
-                counts = count_list_occurrences(results_pair2, selected_lists[pair[1]], selected_lists[pair[0]], pair[1], pair[0])
-                st.info(f"Counts for {pair[1]} and {pair[0]}")
-                # for k, v in counts.items():
-                #     st.write(f"{k}: {v}")
-                st.write(pd.DataFrame(counts.items()).rename(columns={0: "Sequence", 1: "Count"}))                    
+            # every pair of lists comes out of one transition matrix
+            transitions = cache.get(digest, 'transition_matrix', lambda: transition_matrix(spins))
+            follows, not_follows = cache.get(digest, 'follow_counts',
+                                             lambda: follow_counts(transitions, selected_lists), lists_key)
+            st.subheader("Follow counts")
+            st.info("Rows: list of the first number, columns: list of the number after it")
+            st.write(follows)
+            st.subheader("Does not follow counts")
+            st.write(not_follows)
+            fig = px.imshow(transitions, labels=dict(x="Next number", y="Number", color="Count"),
+                            x=list(range(37)), y=list(range(37)), title="Transition Matrix")
+            st.plotly_chart(fig)
+
+        if st.button('Analyze All Files'):
+            st.session_state.corpus_lists = st.session_state.selected_lists
+        if st.session_state.get('corpus_lists') == st.session_state.selected_lists and existing_files:
+            corpus = analyze_corpus(existing_files, selected_lists, analysis_cache())
+            st.subheader(f"Whole corpus ({len(existing_files)} files)")
+            st.write(corpus['totals'])
+            st.subheader("By machine")
+            st.write(corpus['machines'])
+            with st.expander("Per file"):
+                st.write(corpus['files'])
+            fig = px.imshow(corpus['transitions'], labels=dict(x="Next number", y="Number", color="Count"),
+                            x=list(range(37)), y=list(range(37)), title="Pooled Transition Matrix")
+            st.plotly_chart(fig)
+
 if __name__ == "__main__":
     app()
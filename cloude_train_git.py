@@ -4,6 +4,8 @@ import torch.nn as nn
 import pandas as pd
 import math
 from torch.utils.data import Dataset, DataLoader
+from spin_format import load_numbers
+import session_db
 
 # Roulette wheel layout and classes
 WHEEL_LAYOUT = [0, 32, 15, 19, 4, 21, 2, 25, 17, 34, 6, 27, 13, 36, 11, 30, 8, 23, 10, 5, 24, 16, 33, 1, 20, 14, 31, 9, 22, 18, 29, 7, 28, 12, 35, 3, 26]
@@ -74,11 +76,10 @@ class RouletteTransformerModel(nn.Module):
         cls_out = self.fc_cls(x)
         return num_out, pos_out, cls_out
 
-def train_on_file(model, file_path, sequence_length, batch_size, epochs, lr, device):
+def train_on_file(model, file_path, sequence_length, batch_size, epochs, lr, device, data=None):
     print(f"Training on file: {file_path}")
     
-    df = pd.read_csv(file_path)
-    data = df["Number"].tolist()
+    data = load_numbers(file_path).tolist() if data is None else list(data)
     
     dataset = RouletteDataset(data, sequence_length)
     train_size = int(0.8 * len(dataset))
@@ -108,11 +109,10 @@ def train_on_file(model, file_path, sequence_length, batch_size, epochs, lr, dev
 
         print(f"Epoch {epoch+1}, Train Loss: {total_loss/len(train_loader):.4f}")
 
-def predict_for_csv(model, csv_path, sequence_length, device):
+def predict_for_csv(model, csv_path, sequence_length, device, data=None):
     print(f"Predicting for file: {csv_path}")
     
-    df = pd.read_csv(csv_path)
-    data = df["Number"].tolist()
+    data = load_numbers(csv_path).tolist() if data is None else list(data)
     
     predictions = []
 
@@ -145,7 +145,7 @@ def predict_for_csv(model, csv_path, sequence_length, device):
                 "cls_correct": predicted_cls == actual_cls
             })
     
-    pd.DataFrame(predictions).to_csv(f"predictions_{os.path.basename(csv_path)}", index=False)
+    pd.DataFrame(predictions).to_csv(f"predictions_{os.path.splitext(os.path.basename(csv_path))[0]}.csv", index=False)
     
     num_acc = sum(p["num_correct"] for p in predictions) / len(predictions) * 100
     pos_acc = sum(p["pos_correct"] for p in predictions) / len(predictions) * 100
@@ -171,19 +171,16 @@ def main():
     # Initialize model
     model = RouletteTransformerModel(num_classes, pos_classes, cls_classes, d_model, nhead, num_layers).to(device)
 
-    # Train on each CSV file
+    # Train on each session, from the session catalog if there is one
     data_folder = "csv_files"
-    for file in os.listdir(data_folder):
-        if file.endswith(".csv"):
-            file_path = os.path.join(data_folder, file)
-            train_on_file(model, file_path, sequence_length, batch_size, epochs, lr, device)
-            torch.save(model.state_dict(), f"roulette_predictor_{file[:-4]}.pth")
-
-    # Predict for each CSV file
-    for file in os.listdir(data_folder):
-        if file.endswith(".csv"):
-            file_path = os.path.join(data_folder, file)
-            predict_for_csv(model, file_path, sequence_length, device)
+    sessions = session_db.load_sessions(data_folder)
+    for name, spins in sessions.items():
+        train_on_file(model, name, sequence_length, batch_size, epochs, lr, device, spins.tolist())
+        torch.save(model.state_dict(), f"roulette_predictor_{name}.pth")
+
+    # Predict for each session
+    for name, spins in sessions.items():
+        predict_for_csv(model, name, sequence_length, device, spins.tolist())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,69 +1,142 @@
+"""Turn hand-typed spin tables in XLSX workbooks into session files.
+
+Each row of every sheet is read left to right as a run of spins; a cell may
+hold several space-separated numbers (``'14 17'``).  Sheets are streamed in
+read-only mode a chunk of rows at a time and the cells are split with
+vectorised string operations, so workbooks with hundreds of sheets don't
+have to fit in memory as DataFrames.  Tokens that aren't whole numbers from
+0 to 36 are left out and reported.
+
+    python excel.py Table_1.xlsx more_tables/*.xlsx -j 4
+
+writes ``<name>_concatenated.csv`` (one Number column) and
+``<name>_matrix.csv`` (one row per table row) next to each workbook.
+"""
+import argparse
+import itertools
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 
-def extract_and_process_numbers(cell):
-    # Check if cell contains space, indicating possible multiple entries
-    if ' ' in cell:
-        # Attempt to extract numbers from the cell
-        try:
-            # Split the cell by spaces and filter out valid numbers
-            numbers = [str(int(x)) for x in cell.split() if x.isdigit()]
-            #print(numbers)
-            return numbers  # Concatenate the numbers with a space separator
-        except ValueError:
-            return cell  # Return original cell if conversion fails
-    elif cell.isdigit():
-        return int(cell)  # Return the number if the cell contains only a number
-
-    else:
-        return cell  # Return cell directly if no spaces or not handling numbers
-
-# Load the Excel file
-# df = pd.read_excel('Table_1.xlsx')
-# read sheet 1
-file_name = 'Table_1.xlsx'
-df = pd.read_excel(file_name, sheet_name='Sheet', header=None)
-# Convert all data to strings to avoid any data type issues during concatenation
-df = df.astype(str)
-
-# Create a new DataFrame to store the concatenated row
-new_df = pd.DataFrame()
-
-# Initialize an empty list to collect the concatenated data for each column
-concatenated_data = []
-matrix_df = pd.DataFrame()
-
-# Loop through each row and process the data
-for index, row in df.iterrows():
-    matrix_concatenated_data = []    
-    # check if all values are nan
-    if all(pd.isna(row.values)):
-        
-        continue
-    if all(row.values == 'nan'):
-        continue
-    print(row.values)
-    for cell in row:
-        #print(cell)
-        # Extract and process numbers from each cell in the row
-        numbers = extract_and_process_numbers(cell)
-        if isinstance(numbers, list):
-            concatenated_data.extend(numbers)
-            matrix_concatenated_data.extend(numbers)
-        else:
-            if numbers != 'nan':
-                concatenated_data.append(numbers)
-                matrix_concatenated_data.append(numbers)
-    # add each row to the matrix_df
-    matrix_df = pd.concat([matrix_df, pd.DataFrame(matrix_concatenated_data).T], ignore_index=True)
-
-    # processed_row = [extract_and_process_numbers(cell) for cell in row ]
-    # flatten the list
-    # processed_row = [item for sublist in processed_row for item in sublist ]
-    # concatenated_data.append(processed_row)
-# Convert the list to a DataFrame row
-#new_df['Number'] = concatenated_data
-
-
-# Save the new DataFrame to an Excel file
-new_df.to_csv(f'{file_name.split(".")[0]}_concatenated.csv', index=False)
-matrix_df.to_csv(f'{file_name.split(".")[0]}_matrix.csv', index=False)  
\ No newline at end of file
+CHUNK_ROWS = 10000
+
+TableSpins = namedtuple('TableSpins', 'sequence matrix rejected')
+
+
+def extract_and_process_numbers(cells):
+    """Split cells into numbers; a cell may hold several separated by spaces.
+
+    ``cells`` is a sequence of cell values, ``None`` for blanks.  Returns
+    ``(cell, tokens, numbers)`` with one entry per token: the position of its
+    cell in ``cells``, its text, and its value, or NaN when it isn't a whole
+    number from 0 to 36.
+    """
+    tokens = pd.Series(cells, dtype=object).dropna().astype(str).str.split().explode().dropna()
+    values = pd.to_numeric(tokens, errors='coerce').to_numpy(dtype=float)
+    with np.errstate(invalid='ignore'):
+        valid = (values >= 0) & (values <= 36) & (values == np.floor(values))
+    return tokens.index.to_numpy(dtype=np.intp), tokens.to_numpy(dtype=str), np.where(valid, values, np.nan)
+
+
+def _sheet_chunks(sheet, chunk_rows):
+    """``(row numbers, column numbers, cells)`` for blocks of ``chunk_rows`` rows."""
+    rows = enumerate(sheet.iter_rows(values_only=True), start=1)
+    while True:
+        block = list(itertools.islice(rows, chunk_rows))
+        if not block:
+            return
+        lengths = np.array([len(values) for _, values in block], dtype=np.intp)
+        row = np.repeat([number for number, _ in block], lengths)
+        column = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + 1
+        yield row, column, list(itertools.chain.from_iterable(values for _, values in block))
+
+
+def ingest_workbook(path, chunk_rows=CHUNK_ROWS):
+    """Spins of every sheet in an XLSX workbook as ``TableSpins``.
+
+    ``sequence`` is all valid numbers in reading order (uint8), ``matrix`` a
+    DataFrame with one row per table row that has any, indexed by sheet and
+    row and padded with ``<NA>``, and ``rejected`` the tokens left out with
+    their sheet, row and column.
+    """
+    import openpyxl
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    sequence, sheets, rows, row_of, positions, rejected = [], [], [], [], [], []
+    seen = 0
+    try:
+        for sheet in workbook.worksheets:
+            for row, column, cells in _sheet_chunks(sheet, chunk_rows):
+                cell, tokens, numbers = extract_and_process_numbers(cells)
+                valid = ~np.isnan(numbers)
+                if not valid.all():
+                    bad = cell[~valid]
+                    rejected.append(pd.DataFrame({'Sheet': sheet.title, 'Row': row[bad],
+                                                  'Column': column[bad], 'Value': tokens[~valid]}))
+                # tokens come in reading order, so each table row is one contiguous block
+                table_rows, first, counts = np.unique(row[cell[valid]], return_index=True, return_counts=True)
+                sheets.extend([sheet.title] * len(table_rows))
+                rows.append(table_rows)
+                row_of.append(seen + np.repeat(np.arange(len(table_rows)), counts))
+                positions.append(np.arange(counts.sum()) - np.repeat(first, counts))
+                sequence.append(numbers[valid].astype(np.uint8))
+                seen += len(table_rows)
+    finally:
+        workbook.close()
+    if not sequence:
+        sequence, rows, row_of, positions = ([np.empty(0, dtype=np.intp)] for _ in range(4))
+    sequence = np.concatenate(sequence).astype(np.uint8)
+    positions = np.concatenate(positions)
+    grid = np.full((seen, int(positions.max()) + 1 if len(positions) else 0), -1, dtype=np.int8)
+    grid[np.concatenate(row_of), positions] = sequence
+    index = pd.MultiIndex.from_arrays([sheets, np.concatenate(rows)], names=['Sheet', 'Row'])
+    matrix = pd.DataFrame(grid, index=index).astype('Int8').mask(grid < 0)
+    rejected = (pd.concat(rejected, ignore_index=True) if rejected
+                else pd.DataFrame(columns=['Sheet', 'Row', 'Column', 'Value']))
+    return TableSpins(sequence, matrix, rejected)
+
+
+def write_outputs(path, spins, directory=None):
+    """Write ``<name>_concatenated.csv`` and ``<name>_matrix.csv``; returns both paths."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    directory = directory or os.path.dirname(os.path.abspath(path))
+    concatenated = os.path.join(directory, f'{stem}_concatenated.csv')
+    matrix = os.path.join(directory, f'{stem}_matrix.csv')
+    pd.DataFrame({'Number': spins.sequence}).to_csv(concatenated, index=False)
+    spins.matrix.to_csv(matrix, index=False)
+    return concatenated, matrix
+
+
+def _convert(path, directory, chunk_rows):
+    spins = ingest_workbook(path, chunk_rows)
+    return write_outputs(path, spins, directory), len(spins.sequence), spins.rejected
+
+
+def ingest_files(paths, directory=None, workers=None, chunk_rows=CHUNK_ROWS):
+    """Convert many workbooks, in parallel when there is more than one.
+
+    Returns ``[(outputs, spin count, rejected)]`` in the order of ``paths``.
+    """
+    paths = list(paths)
+    if workers == 1 or len(paths) <= 1:
+        return [_convert(path, directory, chunk_rows) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_convert, paths, [directory] * len(paths), [chunk_rows] * len(paths)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Flatten XLSX spin tables into Number CSVs')
+    parser.add_argument('paths', nargs='+', help='XLSX workbooks')
+    parser.add_argument('-o', '--output-dir', help='folder for the CSVs (default: next to each workbook)')
+    parser.add_argument('-j', '--workers', type=int, help='worker processes (default: all cores)')
+    args = parser.parse_args(argv)
+    for path, (outputs, count, rejected) in zip(args.paths, ingest_files(args.paths, args.output_dir, args.workers)):
+        print(f'{path}: {count} spins -> {", ".join(outputs)}')
+        for item in rejected.itertuples(index=False):
+            print(f'  skipped {item.Value!r} in {item.Sheet} row {item.Row}, column {item.Column}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
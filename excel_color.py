@@ -1,7 +1,7 @@
-import pandas as pd
 import openpyxl
 from openpyxl.styles import PatternFill
 import os
+from spin_format import read_session
 # Define the lists
             # "Big": [22, 18, 29, 7, 28, 12, 35, 3, 26, 0, 32, 15, 19, 4, 21, 2, 25],
             # "Orph": [1, 20, 14, 31, 9, 17, 34, 6],
@@ -16,7 +16,7 @@ for file in os.listdir('csv_files'):
 
     filename = os.path.join('csv_files', file)  
     # Read the CSV file into a DataFrame
-    df = pd.read_csv(filename)
+    df = read_session(filename)
 
     # Save DataFrame to Excel
     df.to_excel("data.xlsx", index=False)
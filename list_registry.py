@@ -0,0 +1,167 @@
+"""Registry of the named number lists kept in predefined_lists.json.
+
+Each list is compiled once into a 37-bit mask and a boolean lookup vector,
+so membership tests are a bit test or an array index instead of a scan of a
+Python list.  The file is re-read only when its mtime changes and is saved
+atomically.
+"""
+import json
+import os
+import tempfile
+import numpy as np
+
+LIST_FILE = 'predefined_lists.json'
+
+# lists whose names say what they should hold; a mismatch is reported
+EXPECTED_LISTS = {
+    'first': set(range(1, 13)),
+    'second': set(range(13, 25)),
+    'third': set(range(25, 37)),
+    'first_second': set(range(1, 25)),
+    'second_third': set(range(13, 37)),
+    'first_third': set(range(1, 13)) | set(range(25, 37)),
+    'dozen1': set(range(1, 13)),
+    'dozen2': set(range(13, 25)),
+    'dozen3': set(range(25, 37)),
+    'first_half': set(range(1, 19)),
+    'second_half': set(range(19, 37)),
+    'red': {1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36},
+    'black': {2, 4, 6, 8, 10, 11, 13, 15, 17, 20, 22, 24, 26, 28, 29, 31, 33, 35},
+    'even': set(range(2, 37, 2)),
+    'odd': set(range(1, 37, 2)),
+    'first_column': set(range(1, 37, 3)),
+    'second_column': set(range(2, 37, 3)),
+    'third_column': set(range(3, 37, 3)),
+}
+
+
+def describe(numbers):
+    """``[1, 2, 3, 7]`` -> ``'1-3, 7'``."""
+    parts = []
+    for n in sorted(set(numbers)):
+        if parts and parts[-1][1] == n - 1:
+            parts[-1][1] = n
+        else:
+            parts.append([n, n])
+    return ', '.join(str(a) if a == b else f'{a}-{b}' for a, b in parts)
+
+
+def errors(name, numbers):
+    """Problems that make a list unusable: numbers outside 0-36 or repeated."""
+    problems = []
+    numbers = list(numbers)
+    bad = [n for n in numbers if not isinstance(n, int) or isinstance(n, bool) or not 0 <= n <= 36]
+    if bad:
+        problems.append(f"'{name}' has numbers outside 0-36: {bad}")
+    repeated = sorted({n for n in numbers if n not in bad and numbers.count(n) > 1})
+    if repeated:
+        problems.append(f"'{name}' repeats {repeated}")
+    return problems
+
+
+def validate(name, numbers):
+    """All problems with one list, including a name that doesn't match its numbers."""
+    problems = errors(name, numbers)
+    expected = EXPECTED_LISTS.get(name.lower())
+    if expected is not None and set(numbers) != expected:
+        problems.append(f"'{name}' holds {describe(n for n in numbers if n in range(37))} "
+                        f"but its name suggests {describe(expected)}")
+    return problems
+
+
+class NumberList:
+    """One compiled list: its numbers, a 37-bit ``mask`` and a ``lookup`` vector."""
+
+    def __init__(self, name, numbers):
+        self.name = name
+        seen = []
+        for n in numbers:
+            if isinstance(n, int) and 0 <= n <= 36 and n not in seen:
+                seen.append(n)
+        self.numbers = tuple(seen)
+        self.mask = sum(1 << n for n in self.numbers)
+        self.lookup = np.zeros(37, dtype=bool)
+        self.lookup[list(self.numbers)] = True
+        self.lookup.flags.writeable = False
+
+    def __contains__(self, number):
+        return isinstance(number, (int, np.integer)) and 0 <= number <= 36 and bool(self.mask >> int(number) & 1)
+
+    def __iter__(self):
+        return iter(self.numbers)
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __eq__(self, other):
+        if isinstance(other, NumberList):
+            return self.numbers == other.numbers
+        return list(self.numbers) == list(other)
+
+    def __hash__(self):
+        return hash(self.numbers)
+
+    def __repr__(self):
+        return f'NumberList({self.name!r}, {list(self.numbers)})'
+
+
+def lookup_vector(numbers):
+    """37-long boolean vector for a NumberList or any iterable of numbers."""
+    if isinstance(numbers, NumberList):
+        return numbers.lookup
+    lookup = np.zeros(37, dtype=bool)
+    lookup[[n for n in numbers if 0 <= n <= 36]] = True
+    return lookup
+
+
+class ListRegistry:
+    """Named lists loaded from ``path``, recompiled only when the file changes."""
+
+    def __init__(self, path=LIST_FILE, defaults=None):
+        self.path = path
+        self.defaults = defaults or {}
+        self.mtime = None
+        self.compiled = None
+        self.problems = []
+
+    def _compile(self, raw):
+        self.problems = [p for name, numbers in raw.items() for p in validate(name, numbers)]
+        self.compiled = {name: NumberList(name, numbers) for name, numbers in raw.items()}
+
+    def lists(self):
+        """``{name: NumberList}``; a fresh dict the caller may modify."""
+        mtime = os.stat(self.path).st_mtime_ns if os.path.exists(self.path) else None
+        if self.compiled is None or mtime != self.mtime:
+            raw = self.defaults
+            if mtime is not None:
+                with open(self.path, 'r') as file:
+                    raw = json.load(file)
+            self._compile(raw)
+            self.mtime = mtime
+        return dict(self.compiled)
+
+    def save(self, lists):
+        """Validate and atomically write ``{name: numbers}`` to the file.
+
+        Raises ``ValueError`` for numbers outside 0-36 or repeated numbers.
+        """
+        raw = {name: list(numbers) for name, numbers in lists.items()}
+        problems = [p for name, numbers in raw.items() for p in errors(name, numbers)]
+        if problems:
+            raise ValueError('; '.join(problems))
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as file:
+            json.dump(raw, file, indent=4)
+        os.replace(tmp, self.path)
+        self._compile(raw)
+        self.mtime = os.stat(self.path).st_mtime_ns
+
+    def matrix(self, names=None):
+        """37xL boolean membership matrix of the named lists."""
+        compiled = self.lists()
+        names = list(compiled) if names is None else names
+        matrix = np.zeros((37, len(names)), dtype=bool)
+        for j, name in enumerate(names):
+            matrix[:, j] = compiled[name].lookup
+        return matrix
@@ -1,9 +1,10 @@
 import torch
 import torch.nn as nn
 import torch.optim as optim
-import pandas as pd
 import random
 import os
+from spin_format import load_numbers
+import session_db
 
 class TransformerModel(nn.Module):
     def __init__(self, num_tokens, dim_model, num_heads, num_layers, dim_feedforward, dropout=0.1):
@@ -19,16 +20,13 @@ class TransformerModel(nn.Module):
         x = self.fc_out(x[:, -1, :])
         return x
 def load_csv_data(file_path):
-    data = pd.read_csv(file_path)
-    numbers = data['Number'].tolist()
-    return numbers
+    return load_numbers(file_path).tolist()
 
-# load csv file from csv_files folder
+# load sessions from the session catalog, or the csv_files folder without one
 
-for file in os.listdir('csv_files'):
+for name, spins in session_db.load_sessions('csv_files').items():
 
-    csv_file = os.path.join('csv_files', file)
-    numbers = load_csv_data(csv_file)
+    numbers = spins.tolist()
 
     # Hyperparameters
     num_tokens = 37  # Numbers between 0 and 36
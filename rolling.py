@@ -0,0 +1,90 @@
+"""Rolling-window hit rates of number lists over a session.
+
+Every window is read off one prefix sum of the spins x lists hit matrix, so
+each extra window costs O(n) per list.  Nothing here depends on Streamlit,
+so the Tk logger uses the same functions as the analysis app.
+"""
+import math
+import numpy as np
+import pandas as pd
+
+from list_registry import lookup_vector
+from significance import membership
+
+HOT_COLD_Z = 2.0
+
+
+def hit_matrix(spins, lists):
+    """(spins x lists) 0/1 matrix of which lists each spin belongs to."""
+    spins = np.asarray(spins, dtype=np.intp)
+    valid = (spins >= 0) & (spins <= 36)
+    return membership(lists)[np.where(valid, spins, 0)] * valid[:, None]
+
+
+def rolling_rates(hits, window):
+    """Hit rate over the last ``window`` spins at every spin.
+
+    The first ``window - 1`` spins use all the spins seen so far.
+    """
+    prefix = np.vstack([np.zeros((1, hits.shape[1])), np.cumsum(hits, axis=0)])
+    end = np.arange(1, len(hits) + 1)
+    start = np.maximum(end - window, 0)
+    return (prefix[end] - prefix[start]) / (end - start)[:, None]
+
+
+def ewma_rates(hits, span):
+    """Exponentially weighted hit rate with the usual ``2 / (span + 1)`` decay."""
+    return pd.DataFrame(hits).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def streak_bands(lists, window, z=HOT_COLD_Z):
+    """Per-list ``(expected, cold, hot)`` rates for a window of ``window`` spins.
+
+    A list is hot above ``expected + z`` standard errors and cold below
+    ``expected - z`` standard errors of a fair wheel.
+    """
+    bands = {}
+    for name, numbers in lists.items():
+        p = lookup_vector(numbers).sum() / 37
+        spread = z * math.sqrt(p * (1 - p) / window)
+        bands[name] = (p, max(p - spread, 0.0), min(p + spread, 1.0))
+    return bands
+
+
+def hot_cold(spins, lists, window, z=HOT_COLD_Z):
+    """``'hot'``, ``'cold'`` or ``''`` per list for the last ``window`` spins."""
+    hits = hit_matrix(spins, lists)
+    if not len(hits):
+        return {name: '' for name in lists}
+    rates = rolling_rates(hits, window)[-1]
+    states = {}
+    for rate, (name, (_, cold, hot)) in zip(rates, streak_bands(lists, window, z).items()):
+        states[name] = 'hot' if rate > hot else 'cold' if rate < cold else ''
+    return states
+
+
+def rate_frame(spins, lists, windows=(37,), span=None, z=HOT_COLD_Z):
+    """Long-format table of rolling and EWMA rates plus hot/cold bands.
+
+    Columns are Spin, List, Series and Rate, ready for one Plotly line chart
+    (``color='List', line_dash='Series'``).  Bands are drawn for the first
+    window.
+    """
+    hits = hit_matrix(spins, lists)
+    spin = np.arange(1, len(hits) + 1)
+    names = list(lists.keys())
+    series = {f'Window {w}': rolling_rates(hits, w) for w in windows}
+    if span:
+        series[f'EWMA {span}'] = ewma_rates(hits, span)
+    if windows:
+        bands = streak_bands(lists, windows[0], z)
+        for label, column in (('Expected', 0), ('Cold band', 1), ('Hot band', 2)):
+            series[label] = np.tile([bands[name][column] for name in names], (len(hits), 1))
+    frames = [pd.DataFrame({
+        'Spin': np.tile(spin, len(names)),
+        'List': np.repeat(names, len(hits)),
+        'Series': label,
+        'Rate': values.T.ravel() * 100,
+    }) for label, values in series.items()]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=['Spin', 'List', 'Series', 'Rate'])
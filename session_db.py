@@ -0,0 +1,338 @@
+"""SQLite catalog of machines, sessions and spins.
+
+Machine and start time are parsed from session file names such as
+``Second_machine_16_april_2024_12_30PM.csv`` once, at import, instead of by
+every tool that globs the folders.  Queries return NumPy arrays.
+
+    python session_db.py import csv_files roulette_games
+    python session_db.py list
+"""
+import argparse
+import glob
+import os
+import re
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+import spin_format
+
+DB_PATH = 'sessions.db'
+UNKNOWN_MACHINE = 'unknown'
+SESSION_PATTERNS = ('*.csv', '*.xlsx', '*' + spin_format.SPINS_EXT)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS machines (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    machine_id INTEGER NOT NULL REFERENCES machines(id),
+    name TEXT NOT NULL UNIQUE,
+    started_at TEXT,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS spins (
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    number INTEGER NOT NULL CHECK (number BETWEEN 0 AND 36),
+    PRIMARY KEY (session_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_by_machine ON sessions(machine_id, started_at);
+"""
+
+# the apps share one connection between Streamlit's script threads
+_write_lock = threading.RLock()
+
+MONTHS = {name: i for i, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1)}
+
+
+def machine_name(file_path):
+    """Machine a session was logged on, from names like
+    ``first_machine_16_april_2024_12am.csv`` -> ``first_machine``.
+
+    Names without a machine, such as the Tk logger's, give
+    :data:`UNKNOWN_MACHINE`.
+    """
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    match = re.match(r'(.*?machine)', stem, re.IGNORECASE)
+    return match.group(1).lower() if match else UNKNOWN_MACHINE
+
+
+def session_start(file_path):
+    """Start time in a session file name as an ISO string, or ``None``.
+
+    Understands ``16_april_2024_12_30PM`` style names and the Tk logger's
+    ``game_20240416_123000``.  Names without a year have no usable date.
+    """
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    match = re.search(r'(\d{8})_(\d{6})', stem)
+    if match:
+        return datetime.strptime(''.join(match.groups()), '%Y%m%d%H%M%S').isoformat()
+    match = re.search(r'(\d{1,2})_([a-z]{3})[a-z]*_(\d{4})(?:_(\d{1,2})(?:_(\d{2}))?\s*(am|pm)?)?',
+                      stem, re.IGNORECASE)
+    if not match or match.group(2).lower() not in MONTHS:
+        return None
+    day, month, year, hour, minute, half = match.groups()
+    hour = int(hour or 0)
+    if half:
+        hour = hour % 12 + (12 if half.lower() == 'pm' else 0)
+    try:
+        return datetime(int(year), MONTHS[month.lower()], int(day), hour, int(minute or 0)).isoformat()
+    except ValueError:
+        return None
+
+
+def connect(path=DB_PATH, check_same_thread=True):
+    """Open (creating if needed) the catalog in WAL mode."""
+    conn = sqlite3.connect(path, check_same_thread=check_same_thread)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA foreign_keys=ON')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def session_name(file_path):
+    """Sessions are named after their file's stem."""
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+@contextmanager
+def writing(conn):
+    """One write transaction, serialised across threads and connections.
+
+    The lock covers threads sharing ``conn``; ``BEGIN IMMEDIATE`` takes the
+    database's write lock up front, so a read-then-insert such as picking
+    the next position can't interleave with another connection's.  Nested
+    uses join the outer transaction.
+    """
+    with _write_lock:
+        if conn.in_transaction:
+            yield
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def machine_id(conn, name):
+    conn.execute('INSERT OR IGNORE INTO machines (name) VALUES (?)', (name,))
+    return conn.execute('SELECT id FROM machines WHERE name = ?', (name,)).fetchone()[0]
+
+
+def session_id(conn, name):
+    row = conn.execute('SELECT id FROM sessions WHERE name = ?', (name,)).fetchone()
+    return row[0] if row else None
+
+
+def create_session(conn, name, machine=None, started_at=None, source=None):
+    """Return the id of session ``name``, creating it if needed."""
+    with writing(conn):
+        existing = session_id(conn, name)
+        if existing is not None:
+            return existing
+        cur = conn.execute(
+            'INSERT INTO sessions (machine_id, name, started_at, source) VALUES (?, ?, ?, ?)',
+            (machine_id(conn, machine or UNKNOWN_MACHINE), name, started_at, source))
+    return cur.lastrowid
+
+
+def add_spins(conn, session, numbers):
+    """Append many spins to a session in one transaction."""
+    numbers = np.asarray(numbers, dtype=np.int64)
+    if numbers.size and (numbers.min() < 0 or numbers.max() > 36):
+        raise ValueError('Spins must be integers from 0 to 36')
+    with writing(conn):
+        start = conn.execute('SELECT COALESCE(MAX(position) + 1, 0) FROM spins WHERE session_id = ?',
+                             (session,)).fetchone()[0]
+        conn.executemany('INSERT INTO spins (session_id, position, number) VALUES (?, ?, ?)',
+                         ((session, start + i, int(n)) for i, n in enumerate(numbers)))
+
+
+def append_spin(conn, session, number):
+    add_spins(conn, session, [number])
+
+
+def spin_count(conn, session):
+    return conn.execute('SELECT COUNT(*) FROM spins WHERE session_id = ?', (session,)).fetchone()[0]
+
+
+def replace_spins(conn, session, numbers):
+    """Replace all of a session's spins."""
+    with writing(conn):
+        conn.execute('DELETE FROM spins WHERE session_id = ?', (session,))
+        add_spins(conn, session, numbers)
+
+
+def delete_last_spin(conn, session):
+    """Remove a session's last spin; returns it, or ``None`` if it was empty."""
+    with writing(conn):
+        row = conn.execute('SELECT position, number FROM spins WHERE session_id = ? '
+                           'ORDER BY position DESC LIMIT 1', (session,)).fetchone()
+        if row is None:
+            return None
+        conn.execute('DELETE FROM spins WHERE session_id = ? AND position = ?', (session, row[0]))
+    return row[1]
+
+
+def _numbers(cursor):
+    return np.fromiter((row[0] for row in cursor), dtype=np.uint8)
+
+
+def session_spins(conn, name):
+    """All spins of one session, in order, as a uint8 array."""
+    return _numbers(conn.execute(
+        'SELECT number FROM spins JOIN sessions ON sessions.id = spins.session_id '
+        'WHERE sessions.name = ? ORDER BY position', (name,)))
+
+
+def machine_spins(conn, machine, start=None, end=None):
+    """Spins on ``machine`` from sessions started in ``[start, end)``, in order.
+
+    ``start``/``end`` are ISO dates or datetimes; with either given, sessions
+    without a known start time are left out.
+    """
+    query = ('SELECT number FROM spins JOIN sessions ON sessions.id = spins.session_id '
+             'JOIN machines ON machines.id = sessions.machine_id WHERE machines.name = ?')
+    args = [machine]
+    if start is not None:
+        query += ' AND sessions.started_at >= ?'
+        args.append(str(start))
+    if end is not None:
+        query += ' AND sessions.started_at < ?'
+        args.append(str(end))
+    query += ' ORDER BY sessions.started_at, sessions.id, spins.position'
+    return _numbers(conn.execute(query, args))
+
+
+def list_sessions(conn, machine=None):
+    """DataFrame of sessions with their machine, start time and spin count."""
+    query = ('SELECT sessions.name AS Session, machines.name AS Machine, sessions.started_at AS Started, '
+             '(SELECT COUNT(*) FROM spins WHERE spins.session_id = sessions.id) AS Spins, '
+             'sessions.source AS Source FROM sessions JOIN machines ON machines.id = sessions.machine_id')
+    args = ()
+    if machine is not None:
+        query += ' WHERE machines.name = ?'
+        args = (machine,)
+    return pd.read_sql_query(query + ' ORDER BY Machine, Started, Session', conn, params=args)
+
+
+def list_machines(conn):
+    return [row[0] for row in conn.execute('SELECT name FROM machines ORDER BY name')]
+
+
+def read_file_numbers(path):
+    """Spins of a CSV, ``.spins`` or single-column XLSX session file."""
+    if path.lower().endswith('.xlsx'):
+        import openpyxl
+        workbook = openpyxl.load_workbook(path, read_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, ())
+            if 'Number' not in header:
+                raise KeyError('Number')
+            column = header.index('Number')
+            return np.array([row[column] for row in rows if row[column] is not None], dtype=np.uint8)
+        finally:
+            workbook.close()
+    return spin_format.load_numbers(path)
+
+
+def import_file(conn, path, machine=None, replace=False):
+    """Import one session file.
+
+    A session already in the catalog is left alone unless ``replace``.
+    Returns the session id, or ``None`` when it was skipped.
+    """
+    name = session_name(path)
+    if session_id(conn, name) is not None and not replace:
+        return None
+    numbers = read_file_numbers(path)
+    with writing(conn):
+        existing = session_id(conn, name)
+        if existing is not None:
+            if not replace:
+                return None
+            conn.execute('DELETE FROM sessions WHERE id = ?', (existing,))
+        session = create_session(conn, name, machine or machine_name(path), session_start(path), path)
+        add_spins(conn, session, numbers)
+    return session
+
+
+def sync_session(conn, path, numbers=None, machine=None):
+    """Id of the session for file ``path``, created if needed and holding ``numbers``.
+
+    ``numbers`` defaults to the file's spins.  The spins are rewritten only
+    when the catalog holds a different number of them, so the apps call this
+    once when they open a file and mirror each later edit with
+    ``append_spin``/``delete_last_spin``.
+    """
+    if numbers is None:
+        numbers = read_file_numbers(path)
+    with writing(conn):
+        session = create_session(conn, session_name(path), machine or machine_name(path), session_start(path), path)
+        if spin_count(conn, session) != len(numbers):
+            replace_spins(conn, session, numbers)
+    return session
+
+
+def load_sessions(directory, db_path=DB_PATH):
+    """``{session name: spins}`` of every catalog session if ``db_path`` exists,
+    otherwise of the session files in ``directory``."""
+    if os.path.exists(db_path):
+        conn = connect(db_path)
+        try:
+            names = [row[0] for row in conn.execute('SELECT name FROM sessions ORDER BY started_at, name')]
+            return {name: session_spins(conn, name) for name in names}
+        finally:
+            conn.close()
+    paths = sorted(path for pattern in ('*.csv', '*' + spin_format.SPINS_EXT)
+                   for path in glob.glob(os.path.join(directory, pattern)))
+    return {session_name(path): spin_format.load_numbers(path) for path in paths}
+
+
+def import_directories(conn, directories, replace=False):
+    """Bulk-import every session file in ``directories``; returns how many were added.
+
+    CSV files go first, so a session saved both as CSV and XLSX keeps the CSV.
+    """
+    added = 0
+    for directory in directories:
+        for pattern in SESSION_PATTERNS:
+            for path in sorted(glob.glob(os.path.join(directory, pattern))):
+                try:
+                    added += import_file(conn, path, replace=replace) is not None
+                except (KeyError, ValueError) as e:
+                    print(f'Skipped {path}: {e}', file=sys.stderr)
+    return added
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Roulette session catalog')
+    parser.add_argument('--db', default=DB_PATH, help='catalog file')
+    commands = parser.add_subparsers(dest='command', required=True)
+    importer = commands.add_parser('import', help='import session files from folders')
+    importer.add_argument('directories', nargs='+')
+    importer.add_argument('--replace', action='store_true', help='re-import sessions already present')
+    commands.add_parser('list', help='list sessions')
+    args = parser.parse_args(argv)
+    conn = connect(args.db)
+    if args.command == 'import':
+        print(f'Imported {import_directories(conn, args.directories, args.replace)} sessions')
+    else:
+        print(list_sessions(conn).fillna('').to_string(index=False))
+    conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Significance tests for list hit rates, runs and transitions.
+
+Expected probabilities assume a fair single-zero wheel, so a list of ``m``
+numbers is hit with probability ``m / 37``.  Permutation tests shuffle the
+session many times at once as a 2-D batch and rebuild every shuffle's 37x37
+transition matrix with one ``bincount``; run and follow statistics are then
+matrix products of those transition matrices.
+"""
+import math
+import numpy as np
+import pandas as pd
+
+from list_registry import lookup_vector
+
+PERMUTATION_CHUNK = 256
+
+
+def membership(lists):
+    """37xL float matrix; column j is 1 for the numbers of the j-th list."""
+    matrix = np.zeros((37, len(lists)))
+    for j, numbers in enumerate(lists.values()):
+        matrix[:, j] = lookup_vector(numbers)
+    return matrix
+
+
+def binomial_test(hits, trials, p):
+    """Exact two-sided binomial p-value of ``hits`` successes in ``trials``.
+
+    Sums the probabilities of every outcome no more likely than the one
+    observed, as ``scipy.stats.binomtest`` does.
+    """
+    if trials == 0:
+        return 1.0
+    if p <= 0 or p >= 1:
+        return float(hits == round(p * trials))
+    k = np.arange(trials + 1)
+    log_factorial = np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, trials + 1)))))
+    log_pmf = (log_factorial[trials] - log_factorial[k] - log_factorial[trials - k]
+               + k * math.log(p) + (trials - k) * math.log1p(-p))
+    pmf = np.exp(log_pmf)
+    return float(min(1.0, pmf[pmf <= pmf[hits] * (1 + 1e-7)].sum()))
+
+
+def chi2_sf(x, df):
+    """Survival function of the chi-square distribution for integer ``df``."""
+    if x <= 0:
+        return 1.0
+    half = x / 2
+    if df % 2 == 0:
+        term, total = 1.0, 1.0
+        for i in range(1, df // 2):
+            term *= half / i
+            total += term
+        return min(1.0, math.exp(-half) * total)
+    root = math.sqrt(x)
+    term, total = 1.0, 0.0
+    for i in range(1, (df - 1) // 2 + 1):
+        term *= x / (2 * i - 1) if i > 1 else root
+        total += term
+    density = math.exp(-half) / math.sqrt(2 * math.pi)
+    return min(1.0, math.erfc(root / math.sqrt(2)) + 2 * density * total)
+
+
+def chi_square_test(observed, expected):
+    """Pearson chi-square statistic and p-value, ``len(observed) - 1`` dof."""
+    observed = np.asarray(observed, dtype=float)
+    expected = np.asarray(expected, dtype=float)
+    stat = float(((observed - expected) ** 2 / expected).sum())
+    return stat, chi2_sf(stat, len(observed) - 1)
+
+
+def list_hit_tests(spins, lists):
+    """Per-list hit counts tested against ``len(list) / 37``."""
+    spins = np.asarray(spins, dtype=np.intp)
+    spins = spins[(spins >= 0) & (spins <= 36)]
+    trials = len(spins)
+    hits = np.bincount(spins, minlength=37) @ membership(lists)
+    rows = []
+    for name, count in zip(lists, hits.astype(int)):
+        p = lookup_vector(lists[name]).sum() / 37
+        stat, chi_p = 0.0, 1.0
+        if 0 < p < 1 and trials:
+            stat, chi_p = chi_square_test([count, trials - count], np.array([p, 1 - p]) * trials)
+        rows.append({
+            'List': name,
+            'Hits': count,
+            'Spins': trials,
+            'Expected %': p * 100,
+            'Observed %': count / trials * 100 if trials else 0.0,
+            'Binomial p': binomial_test(count, trials, p),
+            'Chi-square': stat,
+            'Chi-square p': chi_p,
+        })
+    return pd.DataFrame(rows).set_index('List')
+
+
+def wheel_chi_square(spins):
+    """Chi-square test of all 37 numbers being equally likely."""
+    spins = np.asarray(spins, dtype=np.intp)
+    counts = np.bincount(spins[(spins >= 0) & (spins <= 36)], minlength=37)
+    return chi_square_test(counts, np.full(37, counts.sum() / 37))
+
+
+def transition_batch(batch):
+    """(B, 37, 37) transition counts of each row of a (B, n) spin batch."""
+    rows, n = batch.shape
+    codes = batch[:, :-1].astype(np.int32) * 37 + batch[:, 1:]
+    codes += (np.arange(rows, dtype=np.int32) * 37 * 37)[:, None]
+    return np.bincount(codes.ravel(), minlength=rows * 37 * 37).reshape(rows, 37, 37)
+
+
+def follow_statistics(transitions, members):
+    """Follow counts ``members.T @ T @ members`` for a stack of matrices."""
+    return np.einsum('ik,bij,jl->bkl', members, transitions, members, optimize=True)
+
+
+def permutation_test(spins, lists, permutations=10000, seed=None, chunk=PERMUTATION_CHUNK):
+    """Permutation tests of run counts and list-to-list follow counts.
+
+    Shuffles keep the spins of the session and only destroy their order, so
+    the tests ask whether the order itself looks non-random.  Returns
+    ``(runs, follows)``: a per-list table of observed and shuffled run counts
+    with two-sided p-values, and an LxL table of follow-count p-values.
+    """
+    spins = np.asarray(spins)
+    spins = spins[(spins >= 0) & (spins <= 36)].astype(np.int8)
+    members = membership(lists)
+    names = list(lists.keys())
+    hits = np.bincount(spins.astype(np.intp), minlength=37) @ members
+    observed = follow_statistics(transition_batch(spins[None, :]), members)[0]
+    rng = np.random.default_rng(seed)
+    total = np.zeros_like(observed)
+    total_sq = np.zeros_like(observed)
+    samples = []
+    for start in range(0, permutations, chunk):
+        size = min(chunk, permutations - start)
+        batch = np.tile(spins, (size, 1))
+        rng.permuted(batch, axis=1, out=batch)
+        follows = follow_statistics(transition_batch(batch), members)
+        samples.append(follows)
+        total += follows.sum(axis=0)
+        total_sq += (follows ** 2).sum(axis=0)
+    samples = np.concatenate(samples) if samples else np.zeros((0,) + observed.shape)
+    mean = total / max(permutations, 1)
+    extreme = (np.abs(samples - mean) >= np.abs(observed - mean) - 1e-9).sum(axis=0)
+    p_values = (extreme + 1) / (permutations + 1)
+
+    # runs = hits minus member-to-member steps, so both share a p-value
+    diagonal = np.arange(len(names))
+    runs = pd.DataFrame({
+        'Runs': hits - observed[diagonal, diagonal],
+        'Shuffled Runs': hits - mean[diagonal, diagonal],
+        'Shuffled SD': np.sqrt(np.maximum(total_sq / max(permutations, 1) - mean ** 2, 0))[diagonal, diagonal],
+        'p-value': p_values[diagonal, diagonal],
+    }, index=pd.Index(names, name='List'))
+    follows = pd.DataFrame(p_values, index=names, columns=names)
+    return runs, follows
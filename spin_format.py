@@ -0,0 +1,170 @@
+"""Compact binary session files (``.spins``) and loaders for any session file.
+
+Layout, little-endian::
+
+    8s   magic  b'SPINS\\x00\\x00\\x01'
+    Q    number of spins
+    Q    length of the JSON metadata
+    I    flags (bit 0: timestamps present)
+    I    reserved
+    ...  JSON metadata, padded to 8 bytes
+    ...  one uint8 per spin, padded to 8 bytes
+    ...  optional int64 timestamps (ns since the epoch), one per spin
+
+Readers memory-map the file, so loading is O(1) and the arrays returned are
+zero-copy, read-only views.  ``load_numbers`` reads either format, so the
+tools accept ``.spins`` files wherever they take a ``Number`` CSV.
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import tempfile
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+MAGIC = b'SPINS\x00\x00\x01'
+HEADER = struct.Struct('<8sQQII')
+HAS_TIMESTAMPS = 1
+SPINS_EXT = '.spins'
+
+SpinFile = namedtuple('SpinFile', 'spins timestamps metadata')
+
+
+def _pad(n):
+    return -n % 8
+
+
+def is_spin_file(path):
+    """True if ``path`` starts with the ``.spins`` magic bytes."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_spins(path, spins, timestamps=None, metadata=None):
+    """Atomically write a ``.spins`` file.
+
+    ``spins`` must be integers 0-36; ``timestamps`` (optional) anything
+    ``pd.to_datetime`` accepts, one per spin.
+    """
+    spins = np.asarray(spins)
+    if spins.size and (not np.issubdtype(spins.dtype, np.integer) or spins.min() < 0 or spins.max() > 36):
+        raise ValueError('Spins must be integers from 0 to 36')
+    flags = 0
+    if timestamps is not None:
+        timestamps = pd.to_datetime(pd.Series(timestamps)).to_numpy('datetime64[ns]').view(np.int64)
+        if len(timestamps) != len(spins):
+            raise ValueError('Need one timestamp per spin')
+        flags |= HAS_TIMESTAMPS
+    meta = json.dumps(metadata or {}).encode()
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(spins), len(meta), flags, 0))
+        f.write(meta + b'\0' * _pad(len(meta)))
+        f.write(spins.astype(np.uint8).tobytes() + b'\0' * _pad(len(spins)))
+        if timestamps is not None:
+            f.write(timestamps.astype('<i8').tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+def open_spins(path):
+    """Memory-map a ``.spins`` file; returns ``SpinFile(spins, timestamps, metadata)``.
+
+    ``spins`` is a read-only uint8 view and ``timestamps`` a datetime64[ns]
+    view or ``None``.
+    """
+    with open(path, 'rb') as f:
+        magic, count, meta_len, flags, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a {SPINS_EXT} file')
+        metadata = json.loads(f.read(meta_len) or b'{}')
+    offset = HEADER.size + meta_len + _pad(meta_len)
+    if count:
+        spins = np.memmap(path, dtype=np.uint8, mode='r', offset=offset, shape=(count,))
+    else:
+        spins = np.empty(0, dtype=np.uint8)
+    timestamps = None
+    if flags & HAS_TIMESTAMPS:
+        offset += count + _pad(count)
+        timestamps = (np.memmap(path, dtype='<i8', mode='r', offset=offset, shape=(count,))
+                      if count else np.empty(0, dtype='<i8')).view('datetime64[ns]')
+    return SpinFile(spins, timestamps, metadata)
+
+
+def load_numbers(path):
+    """Spins of a session file as a uint8 array, from ``.spins`` or a Number CSV.
+
+    Raises ``KeyError('Number')`` for a CSV without that column and
+    ``ValueError`` naming the data rows whose number isn't an integer 0-36.
+    """
+    if is_spin_file(path):
+        return open_spins(path).spins
+    df = pd.read_csv(path, usecols=lambda column: column == 'Number')
+    if 'Number' not in df.columns:
+        raise KeyError('Number')
+    return number_column(df['Number'], path)
+
+
+def number_column(column, path=''):
+    """A CSV's Number column as uint8, blanks dropped; ``ValueError`` for bad values."""
+    numbers = pd.to_numeric(column.dropna(), errors='coerce')
+    bad = numbers.isna() | (numbers < 0) | (numbers > 36) | (numbers != numbers.round())
+    if bad.any():
+        rows = ', '.join(str(i + 1) for i in numbers.index[bad][:10])
+        raise ValueError(f'{path}: Number must be an integer from 0 to 36 (rows {rows}'
+                         f'{" ..." if bad.sum() > 10 else ""})')
+    return numbers.to_numpy().astype(np.uint8)
+
+
+def read_session(path):
+    """Session file as a DataFrame with a Number (and Timestamp) column."""
+    if not is_spin_file(path):
+        return pd.read_csv(path)
+    spin_file = open_spins(path)
+    df = pd.DataFrame({'Number': np.asarray(spin_file.spins, dtype=np.int64)})
+    if spin_file.timestamps is not None:
+        df['Timestamp'] = spin_file.timestamps
+    return df
+
+
+def csv_to_spins(csv_path, spins_path=None, metadata=None):
+    """Convert a Number CSV (optionally with a Timestamp column) to ``.spins``."""
+    df = pd.read_csv(csv_path)
+    extra = set(df.columns) - {'Number', 'Timestamp'}
+    if 'Number' not in df.columns or extra:
+        raise ValueError(f'{csv_path}: expected a Number column and optionally Timestamp, got {list(df.columns)}')
+    if df['Number'].isna().any():
+        raise ValueError(f'{csv_path}: Number column has blanks')
+    meta = {'source': os.path.basename(csv_path)}
+    meta.update(metadata or {})
+    spins_path = spins_path or os.path.splitext(csv_path)[0] + SPINS_EXT
+    return write_spins(spins_path, df['Number'].to_numpy(), df.get('Timestamp'), meta)
+
+
+def spins_to_csv(spins_path, csv_path=None):
+    """Write a ``.spins`` file back out as a Number CSV."""
+    csv_path = csv_path or os.path.splitext(spins_path)[0] + '.csv'
+    read_session(spins_path).to_csv(csv_path, index=False)
+    return csv_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert session files between CSV and .spins')
+    parser.add_argument('direction', choices=['to-spins', 'to-csv'])
+    parser.add_argument('paths', nargs='+')
+    args = parser.parse_args(argv)
+    convert = csv_to_spins if args.direction == 'to-spins' else spins_to_csv
+    for path in args.paths:
+        print(convert(path))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
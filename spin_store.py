@@ -0,0 +1,147 @@
+"""Append-only store for a session's ``Number`` CSV.
+
+Each spin is one line appended to the file and fsynced, so logging a spin
+costs the same at 10 spins as at a million and never rewrites the file.
+Undo truncates the file back to where the last line starts.  The last few
+spins are kept in memory together with their byte offsets, so showing the
+tail or undoing doesn't read the file either.  Other columns, such as the
+Timestamp that ``spin_format.spins_to_csv`` writes, are left empty in
+appended rows, which end with the same line terminator as the header.
+"""
+import os
+from collections import deque
+
+HEADER = b'Number\n'
+TAIL_SIZE = 100
+BLOCK_SIZE = 1 << 16
+
+
+def create_store_file(path):
+    """Create an empty session file with just the header, if it doesn't exist."""
+    if not os.path.exists(path):
+        with open(path, 'xb') as f:
+            f.write(HEADER)
+            f.flush()
+            os.fsync(f.fileno())
+    return path
+
+
+class SpinStore:
+    """A session CSV opened for appending, with a cached tail of spins."""
+
+    def __init__(self, path, tail_size=TAIL_SIZE):
+        self.path = path
+        self.tail_size = tail_size
+        self.reload()
+
+    def reload(self):
+        """Re-scan the file; needed only if something else changed it."""
+        create_store_file(self.path)
+        with open(self.path, 'rb') as f:
+            self.newline = b'\r\n' if f.readline().endswith(b'\r\n') else b'\n'
+        with open(self.path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                f.write(HEADER)
+            else:
+                f.seek(size - 1)
+                if f.read(1) != b'\n':
+                    # keep a last line written without a newline
+                    f.write(self.newline)
+        lines = 0
+        with open(self.path, 'rb') as f:
+            header = f.readline()
+            self.header_end = len(header)
+            columns = [c.strip().strip(b'"') for c in header.rstrip(b'\r\n').split(b',')]
+            self.column = columns.index(b'Number') if b'Number' in columns else 0
+            self.width = len(columns)
+            for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+                lines += block.count(b'\n')
+        self.count = lines
+        self.tail = deque(self._read_tail(self.tail_size), maxlen=self.tail_size)
+        self._stat = self._current_stat()
+
+    def _current_stat(self):
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _check(self):
+        if self._current_stat() != self._stat:
+            self.reload()
+
+    def _read_tail(self, n):
+        """Last ``n`` spins as ``(offset, number)`` pairs, reading backwards."""
+        with open(self.path, 'rb') as f:
+            end = f.seek(0, os.SEEK_END)
+            data = b''
+            start = end
+            while start > self.header_end and data.count(b'\n') <= n:
+                start = max(self.header_end, start - BLOCK_SIZE)
+                f.seek(start)
+                data = f.read(end - start)
+        records = []
+        offset = start
+        for line in data.split(b'\n')[:-1]:
+            records.append((offset, line))
+            offset += len(line) + 1
+        if start > self.header_end:
+            # the first piece may be a partial line
+            records = records[1:]
+        numbers = []
+        for offset, line in records:
+            fields = line.split(b',')
+            if len(fields) > self.column and fields[self.column].strip():
+                numbers.append((offset, int(float(fields[self.column]))))
+        return numbers[-n:] if n else []
+
+    def _row(self, num):
+        fields = [''] * self.width
+        fields[self.column] = str(int(num))
+        return ','.join(fields).encode() + self.newline
+
+    def __len__(self):
+        self._check()
+        return self.count
+
+    def append(self, num):
+        """Append one spin and flush it to disk."""
+        self._check()
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            f.write(self._row(num))
+            f.flush()
+            os.fsync(f.fileno())
+        self.tail.append((offset, int(num)))
+        self.count += 1
+        self._stat = self._current_stat()
+
+    def pop(self):
+        """Remove the last spin by truncating the file; returns it or ``None``."""
+        self._check()
+        if not self.count:
+            return None
+        if not self.tail:
+            self.tail.extend(self._read_tail(self.tail_size))
+        offset, num = self.tail.pop()
+        with open(self.path, 'rb+') as f:
+            f.truncate(offset)
+            f.flush()
+            os.fsync(f.fileno())
+        self.count -= 1
+        self._stat = self._current_stat()
+        if not self.tail and self.count:
+            self.tail.extend(self._read_tail(self.tail_size))
+        return num
+
+    def last(self, n):
+        """The last ``n`` spins, oldest first (at most ``tail_size`` from cache)."""
+        self._check()
+        if n > len(self.tail) and self.count > len(self.tail):
+            return [num for _, num in self._read_tail(n)]
+        return [num for _, num in self.tail][-n:] if n else []
+
+    def read_bytes(self):
+        """The whole file, ready to hand to a download."""
+        with open(self.path, 'rb') as f:
+            return f.read()
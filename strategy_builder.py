@@ -1,7 +1,22 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
+import argparse
+import glob
+import functools
+import hashlib
+import itertools
+import json
+import math
+from concurrent.futures import ProcessPoolExecutor
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+import time
+import numpy as np
 import pandas as pd
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import spin_format
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import matplotlib.pyplot as plt
 
 RED_NUMBERS = {1,3,5,7,9,12,14,16,18,19,21,23,25,27,30,32,34,36}
@@ -21,6 +36,38 @@ COLUMN_1 = {n for n in range(1, 37) if (n - 1) % 3 == 0}
 COLUMN_2 = {n for n in range(1, 37) if (n - 2) % 3 == 0}
 COLUMN_3 = {n for n in range(1, 37) if (n - 3) % 3 == 0}
 
+BET_GROUPS = {
+    'RED_NUMBERS': RED_NUMBERS,
+    'BLACK_NUMBERS': BLACK_NUMBERS,
+    'EVEN_NUMBERS': EVEN_NUMBERS,
+    'ODD_NUMBERS': ODD_NUMBERS,
+    'LOW_NUMBERS': LOW_NUMBERS,
+    'HIGH_NUMBERS': HIGH_NUMBERS,
+    'DOZEN_1': DOZEN_1,
+    'DOZEN_2': DOZEN_2,
+    'DOZEN_3': DOZEN_3,
+    'COLUMN_1': COLUMN_1,
+    'COLUMN_2': COLUMN_2,
+    'COLUMN_3': COLUMN_3,
+    'VOISINS': VOISINS,
+    'ORPHELINS': ORPHELINS,
+    'TIERS': TIERS,
+}
+
+SIMULATE_BLOCK_CELLS = 4_000_000
+MAX_SWEEP_GROUPS = 12
+SWEEP_ROWS_SHOWN = 500
+MONTE_CARLO_SHARD = 1000
+MONTE_CARLO_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+EXACT_ODDS_TOLERANCE = 1e-15
+EXACT_ODDS_POLL_MS = 100
+PROGRESSION_LEVELS = 1024
+DEFAULT_PROGRESSION = 'Default'
+TRAJECTORY_CACHE_BYTES = 256 * 1024 * 1024
+STREAM_CHUNK_ROWS = 1_000_000
+ROUNDS_PAGE_ROWS = 30
+GRAPH_BUCKETS = 1000
+
 
 def roulette_bets_table(min_bet):
     bets = [
@@ -81,6 +128,747 @@ def roulette_bets_table(min_bet):
 
     return bet_summary
 
+def membership_matrix(bets) -> np.ndarray:
+    """Return a 37xK boolean matrix where column k marks the numbers of bet k."""
+    matrix = np.zeros((37, len(bets)), dtype=bool)
+    for k, b in enumerate(bets):
+        nums = [n for n in b['nums'] if 0 <= n <= 36]
+        matrix[nums, k] = True
+    return matrix
+
+
+def spin_hits(spins, matrix: np.ndarray) -> np.ndarray:
+    """Look up every spin in a membership matrix, adding a trailing K axis.
+
+    Spins outside 0-36 never hit, matching ``num in set`` in the Python engine.
+    """
+    spins = np.asarray(spins)
+    valid = (spins >= 0) & (spins <= 36)
+    idx = np.where(valid, spins, 0).astype(np.intp)
+    return matrix[idx] & valid[..., None]
+
+
+def _fibonacci(levels):
+    units = np.ones(levels)
+    for i in range(2, levels):
+        units[i] = units[i - 1] + units[i - 2]
+    return units
+
+
+def _labouchere(levels, line=(1, 2, 3)):
+    # bet first + last of the line; every loss appends the lost bet to the line
+    units = np.empty(levels)
+    units[0] = line[0] + line[-1]
+    for i in range(1, levels):
+        units[i] = line[0] + units[i - 1]
+    return units
+
+
+# Stake multipliers by number of losses since the bet was placed.  A betting
+# streak always ends at its first win, so only loss-driven progressions fit.
+PROGRESSIONS = {
+    'Flat': lambda levels: np.ones(levels),
+    'Martingale': lambda levels: np.ldexp(1.0, np.arange(levels)),
+    "D'Alembert": lambda levels: np.arange(1.0, levels + 1),
+    'Fibonacci': _fibonacci,
+    'Labouchere': _labouchere,
+}
+
+
+@functools.lru_cache(maxsize=256)
+def compile_progression(progression, limit=None):
+    """Compile a progression into a stake-multiplier table by loss streak.
+
+    ``progression`` is a name from :data:`PROGRESSIONS` or a tuple of custom
+    multipliers, whose last entry repeats once the list runs out.  ``limit``
+    caps every multiplier (a table limit divided by the base stake).  The
+    table has :data:`PROGRESSION_LEVELS` entries so the engines can look a
+    stake up by loss count; it is shared, so treat it as read-only.
+    """
+    if isinstance(progression, str):
+        if progression not in PROGRESSIONS:
+            raise ValueError(f'Unknown progression: {progression}')
+        table = PROGRESSIONS[progression](PROGRESSION_LEVELS)
+    else:
+        custom = np.asarray(progression, dtype=float)
+        if not len(custom) or (custom <= 0).any():
+            raise ValueError('Custom progression needs positive multipliers')
+        table = np.concatenate([custom, np.full(PROGRESSION_LEVELS, custom[-1])])[:PROGRESSION_LEVELS]
+    if limit is not None:
+        table = np.minimum(table, limit)
+    table.setflags(write=False)
+    return table
+
+
+def bet_progression(bet, martingale):
+    """Return the compiled multiplier table of one bet dict.
+
+    Bets may carry a ``progression`` (name or multiplier list) and a
+    ``limit`` (maximum stake); otherwise ``martingale`` picks between the
+    Martingale and Flat tables.
+    """
+    progression = bet.get('progression') or ('Martingale' if martingale else 'Flat')
+    if not isinstance(progression, str):
+        progression = tuple(progression)
+    limit = bet.get('limit')
+    return compile_progression(progression, limit / bet['bet'] if limit else None)
+
+
+def bet_progressions(bets, martingale):
+    """Progression argument for :func:`bet_trajectories` covering ``bets``.
+
+    Plain bets keep the ``martingale`` flag; as soon as one bet has its own
+    progression or limit, a (K, levels) table is returned.
+    """
+    if not any(b.get('progression') or b.get('limit') for b in bets):
+        return martingale
+    return np.stack([bet_progression(b, martingale) for b in bets])
+
+
+def bet_trajectories(hits, first, break_n, martingale, misses=0):
+    """Vectorised ``BetState`` for independent bets over a whole spin series.
+
+    A bet is active on a spin exactly when the run of misses before it has
+    reached ``break_n``, and its stake only depends on how long that run
+    is, so the state machine reduces to a running miss counter computed with
+    a cumulative max over hit positions.  ``hits`` has shape (n, K); the other
+    arguments broadcast against K.  ``martingale`` is either a flag (doubling
+    or flat stakes) or a compiled progression table, 1-D for all bets or
+    (K, levels) for one per bet, turning each stake into an index lookup.
+    ``misses`` is the length of each bet's miss run before the first spin,
+    for continuing a series chunk by chunk.
+    Returns ``(stakes, profits)``, both (n, K) float arrays where ``stakes`` is
+    zero for bets not placed on that spin.
+    """
+    hits = np.asarray(hits, dtype=bool)
+    n = hits.shape[0]
+    first = np.asarray(first, dtype=float)
+    trigger = np.maximum(np.asarray(break_n), 1)
+    positions = np.arange(n).reshape((n,) + (1,) * (hits.ndim - 1))
+    carried = np.broadcast_to(np.asarray(misses, dtype=np.int64), hits.shape[1:])
+    last_hit = np.maximum.accumulate(np.where(hits, positions, -1 - carried), axis=0)
+    run = positions - last_hit
+    misses_before = np.concatenate([carried[None], run[:-1]])
+    betting = misses_before >= trigger
+    level = np.where(betting, misses_before - trigger, 0)
+    if isinstance(martingale, np.ndarray):
+        level = np.minimum(level, martingale.shape[-1] - 1)
+        if martingale.ndim == 1:
+            units = martingale[level]
+        else:
+            units = martingale[np.arange(martingale.shape[0]), level]
+        stakes = np.where(betting, first * units, 0.0)
+    else:
+        level = np.where(martingale, level, 0)
+        stakes = np.where(betting, np.ldexp(first, level), 0.0)
+    profits = np.where(hits, stakes, -stakes)
+    return stakes, profits
+
+
+def benchmark_engines(sizes=(10_000, 1_000_000, 10_000_000), python_limit=1_000_000,
+                      break_n=3, martingale=True, seed=0):
+    """Time both simulate engines on random spins and check they agree.
+
+    The Python engine builds one dict per round, so it is only run up to
+    ``python_limit`` spins; larger sizes time the NumPy engine alone.
+    """
+    rng = np.random.default_rng(seed)
+    bets = [{'nums': RED_NUMBERS, 'bet': 1},
+            {'nums': DOZEN_2, 'bet': 2},
+            {'nums': VOISINS, 'bet': 1}]
+    results = []
+    for size in sizes:
+        spins = rng.integers(0, 37, size).tolist()
+        start = time.perf_counter()
+        fast = StrategyBuilder.simulate(spins, bets, break_n, martingale, 100.0, engine='numpy')
+        numpy_time = time.perf_counter() - start
+        python_time = None
+        if size <= python_limit:
+            start = time.perf_counter()
+            slow = StrategyBuilder.simulate(spins, bets, break_n, martingale, 100.0, engine='python')
+            python_time = time.perf_counter() - start
+            if fast[0] != slow[0]:
+                raise AssertionError('final balance differs between engines')
+            if fast[1] != slow[1]:
+                raise AssertionError('history differs between engines')
+            pd.testing.assert_frame_equal(fast[2], slow[2], check_dtype=False)
+        results.append({'Spins': size, 'NumPy (s)': numpy_time, 'Python (s)': python_time})
+    return pd.DataFrame(results)
+
+def parse_pairs(text, count):
+    """Parse split (``'1-2,3-4'``) or corner (``'1-2-4-5'``) text into sets."""
+    pairs = []
+    if not text:
+        return pairs
+    for item in text.replace(',', ' ').split():
+        nums = item.split('-')
+        if len(nums) != count:
+            continue
+        try:
+            vals = [int(n) for n in nums]
+        except ValueError:
+            continue
+        if all(0 <= n <= 36 for n in vals):
+            pairs.append(set(vals))
+    return pairs
+
+
+def spec_bets(spec):
+    """Build the ``bets`` list of a strategy spec dict.
+
+    A spec has optional ``groups`` (names from :data:`BET_GROUPS`),
+    ``numbers``, ``splits`` and ``corners`` (``parse_pairs`` syntax) and a
+    ``stake``; ``break_n``, ``martingale`` and ``initial_balance`` configure
+    the run itself.  ``progression`` and ``limit`` apply to every bet and
+    ``progressions`` maps a group name (or ``NUMBERS``, ``SPLITS``,
+    ``CORNERS``) to its own progression.
+    """
+    stake = spec.get('stake', 1)
+    overrides = spec.get('progressions', {})
+
+    def bet(nums, key):
+        b = {'nums': nums, 'bet': stake}
+        progression = overrides.get(key, spec.get('progression'))
+        if progression:
+            b['progression'] = progression
+        if spec.get('limit'):
+            b['limit'] = spec['limit']
+        return b
+
+    bets = []
+    numbers = {n for n in spec.get('numbers', []) if 0 <= n <= 36}
+    if numbers:
+        bets.append(bet(numbers, 'NUMBERS'))
+    for name in spec.get('groups', []):
+        if name not in BET_GROUPS:
+            raise ValueError(f'Unknown bet group: {name}')
+        bets.append(bet(BET_GROUPS[name], name))
+    for pair in parse_pairs(spec.get('splits', ''), 2):
+        bets.append(bet(pair, 'SPLITS'))
+    for quad in parse_pairs(spec.get('corners', ''), 4):
+        bets.append(bet(quad, 'CORNERS'))
+    return bets
+
+
+def run_spec_file(path, bets, break_n, martingale, initial_balance, rounds_dir=None):
+    """Evaluate one CSV for the batch runner; runs inside a worker process."""
+    row = {'File': os.path.basename(path)}
+    log_path = None
+    if rounds_dir:
+        log_path = os.path.join(rounds_dir, os.path.splitext(row['File'])[0] + '_rounds.csv')
+    try:
+        summary = simulate_stream(iter_spin_chunks(path), bets, break_n, martingale,
+                                  initial_balance, log_path=log_path)
+    except Exception as e:
+        row['Error'] = str(e)
+        return row
+    row.update(summary)
+    row['Hit Rate (%)'] = summary['Hits'] / summary['Rounds'] * 100 if summary['Rounds'] else 0
+    row['Profit/Loss'] = summary['Final Balance'] - initial_balance
+    return row
+
+
+def run_spec(spec, directory, output=None, rounds_dir=None, workers=None):
+    """Evaluate a strategy spec on every CSV in ``directory`` in parallel.
+
+    Returns the per-file summary table, also written to ``output`` if given.
+    With ``rounds_dir`` each file's rounds table is written there as well.
+    """
+    bets = spec_bets(spec)
+    if not bets:
+        raise ValueError('Spec selects no numbers or groups')
+    paths = sorted(glob.glob(os.path.join(directory, '*.csv'))
+                   + glob.glob(os.path.join(directory, '*' + spin_format.SPINS_EXT)))
+    if rounds_dir:
+        os.makedirs(rounds_dir, exist_ok=True)
+    args = (bets, spec.get('break_n', 3), spec.get('martingale', True),
+            spec.get('initial_balance', 100.0), rounds_dir)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rows = list(pool.map(run_spec_file, paths, *[[a] * len(paths) for a in args]))
+    df = pd.DataFrame(rows)
+    if output:
+        df.to_csv(output, index=False)
+    return df
+
+
+def progression_key(group_name):
+    """Map a ``selected_groups`` name to the key used for per-group progressions."""
+    kind = group_name.split()[0]
+    return {'SPLIT': 'SPLITS', 'CORNER': 'CORNERS'}.get(kind, kind)
+
+
+def parse_range(text):
+    """Parse ``'3'``, ``'1-6'`` or ``'1,3,5'`` into a sorted list of ints."""
+    values = set()
+    for item in text.replace(',', ' ').split():
+        lo, _, hi = item.partition('-')
+        values.update(range(int(lo), int(hi or lo) + 1))
+    return sorted(values)
+
+
+def sweep(spins, group_combos, break_range, bet_range, martingale_options=(True, False),
+          initial_balance=0.0, groups=None, progressions=None, limit=None):
+    """Evaluate every strategy configuration over ``spins`` in one batch.
+
+    ``group_combos`` is a list of tuples of group names looked up in ``groups``
+    (default :data:`BET_GROUPS`).  Every combination of combo, ``break_n`` from
+    ``break_range``, stake from ``bet_range`` and Martingale flag is scored.
+    ``progressions`` maps group names to their own progression and ``limit``
+    is the table limit, as in bet dicts.
+    Spin hits are computed once; the unit-stake trajectory of each group is
+    advanced for all break values together, and combos are formed by a
+    matrix product, since a strategy's profit is the sum of its groups' profits
+    and scales linearly with the stake.  A table limit caps the multipliers
+    differently for every stake, so then the trajectories are redone per
+    stake.  Returns a DataFrame ranked by final balance.
+    """
+    groups = BET_GROUPS if groups is None else groups
+    names = sorted({name for combo in group_combos for name in combo})
+    column = {name: k for k, name in enumerate(names)}
+    hits = spin_hits(spins, membership_matrix([{'nums': groups[name]} for name in names]))
+    combos = np.zeros((len(names), len(group_combos)))
+    for c, combo in enumerate(group_combos):
+        combos[[column[name] for name in combo], c] = 1
+    breaks = np.asarray(list(break_range))
+    stakes = list(bet_range)
+    progressions = progressions or {}
+
+    rows = []
+    block = max(1, SIMULATE_BLOCK_CELLS // max(len(spins) * len(breaks), 1))
+    hit_rate = np.zeros(len(group_combos))
+    for start in range(0, len(group_combos), block):
+        cols = slice(start, start + block)
+        if len(spins):
+            hit_rate[cols] = ((hits @ combos[:, cols]) > 0).mean(axis=0) * 100
+    stake_sets = [[stake] for stake in stakes] if limit else [stakes]
+    for martingale in martingale_options:
+        for stake_set in stake_sets:
+            # a zero stake never wins or loses, whatever its cap
+            table = bet_progressions([{'bet': stake_set[0] or 1, 'progression': progressions.get(name),
+                                       'limit': limit} for name in names], martingale)
+            # (n, breaks, groups) unit-stake profits for every break value at once
+            _, profits = bet_trajectories(hits[:, None, :], 1.0, breaks[:, None], table)
+            for start in range(0, len(group_combos), block):
+                cols = slice(start, start + block)
+                # (n, breaks, combos) running unit profit of each combo
+                running = np.cumsum(np.einsum('nbg,gc->nbc', profits, combos[:, cols]), axis=0)
+                final = running[-1] if len(spins) else np.zeros(running.shape[1:])
+                lowest = running.min(axis=0, initial=0)
+                for b, break_n in enumerate(breaks):
+                    for c, combo in enumerate(group_combos[cols], start=start):
+                        for stake in stake_set:
+                            rows.append({
+                                'Groups': ' + '.join(combo),
+                                'Break': int(break_n),
+                                'Min Bet': stake,
+                                'Martingale': bool(martingale),
+                                'Final Balance': initial_balance + stake * final[b, c - start],
+                                'Min Balance': initial_balance + stake * lowest[b, c - start],
+                                'Hit Rate (%)': hit_rate[c],
+                            })
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    return df.sort_values(['Final Balance', 'Min Balance'], ascending=False, ignore_index=True)
+
+def wheel_probabilities(bias=None):
+    """Return per-number probabilities for a European wheel, optionally biased.
+
+    ``bias`` is a length-37 vector of relative weights (1 = fair).
+    """
+    if bias is None:
+        return np.full(37, 1 / 37)
+    weights = np.asarray(bias, dtype=float)
+    if weights.shape != (37,) or (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError('bias must be 37 non-negative weights')
+    return weights / weights.sum()
+
+
+def parse_bias(text):
+    """Parse ``'17:2, 5:1.5'`` into a length-37 weight vector (None if empty)."""
+    if not text.strip():
+        return None
+    weights = np.ones(37)
+    for item in text.replace(',', ' ').split():
+        num, _, weight = item.partition(':')
+        num = int(num)
+        if not 0 <= num <= 36:
+            raise ValueError(f'{num} is not a roulette number')
+        weights[num] = float(weight)
+    return weights
+
+
+def _monte_carlo_shard(seed, sessions, spins, probabilities, bets, break_n, martingale,
+                       initial_balance):
+    """Simulate one shard of synthetic sessions; runs inside a worker process."""
+    rng = np.random.default_rng(seed)
+    wheel = rng.choice(37, size=(spins, sessions), p=probabilities)
+    first = np.array([b['bet'] for b in bets], dtype=float)
+    _, profits = bet_trajectories(spin_hits(wheel, membership_matrix(bets)), first,
+                                  break_n, bet_progressions(bets, martingale))
+    balance = initial_balance + np.cumsum(profits.sum(axis=2), axis=0)
+    peak = np.maximum(np.maximum.accumulate(balance, axis=0), initial_balance)
+    lowest = np.minimum(balance.min(axis=0), initial_balance)
+    return balance[-1], lowest, (peak - balance).max(axis=0)
+
+
+def monte_carlo(bets, break_n, martingale, initial_balance, sessions=10_000, spins=500,
+                seed=0, bias=None, workers=None):
+    """Run a strategy over ``sessions`` synthetic sessions of ``spins`` spins.
+
+    Sessions are generated in fixed shards of :data:`MONTE_CARLO_SHARD`, each
+    seeded from its own child of ``SeedSequence(seed)``, and the shards are
+    spread over a process pool.  Results therefore depend only on ``seed``,
+    never on ``workers``.  Returns ``(summary, per_session)``: quantiles of
+    final balance and max drawdown plus the probability of ruin (balance
+    reaching 0 or below), and one row per session.
+    """
+    probabilities = wheel_probabilities(bias)
+    sizes = [min(MONTE_CARLO_SHARD, sessions - start)
+             for start in range(0, sessions, MONTE_CARLO_SHARD)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(s, size, spins, probabilities, bets, break_n, martingale, initial_balance)
+            for s, size in zip(seeds, sizes)]
+    if workers == 1 or len(args) <= 1:
+        shards = [_monte_carlo_shard(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shards = list(pool.map(_monte_carlo_shard, *zip(*args)))
+    finals, lowest, drawdowns = (np.concatenate(parts) for parts in zip(*shards))
+    per_session = pd.DataFrame({
+        'Final Balance': finals,
+        'Min Balance': lowest,
+        'Max Drawdown': drawdowns,
+        'Ruined': lowest <= 0,
+    })
+    summary = per_session[['Final Balance', 'Max Drawdown']].quantile(list(MONTE_CARLO_QUANTILES))
+    summary.index.name = 'Quantile'
+    summary.attrs['ruin_probability'] = float(per_session['Ruined'].mean())
+    return summary, per_session
+
+def exact_odds(nums, first, break_n, martingale, initial_balance, horizon, bias=None,
+               progression=None, limit=None):
+    """Exact expected profit, variance and bust probability of one bet group.
+
+    Dynamic programming over (gap, bet level, bankroll) states of
+    ``BetState`` for ``horizon`` spins.  The bankroll is counted in units of
+    ``first`` and play stops at the first spin the balance drops to 0 or
+    below (bust).  The bankroll axis is clipped to what can be reached so far,
+    probabilities under 1e-200 are dropped, and the loop ends early once less
+    than :data:`EXACT_ODDS_TOLERANCE` of the probability is still in play.
+    ``progression`` and ``limit`` work as in bet dicts and override
+    ``martingale``; their stakes must be whole multiples of ``first``.
+    Returns a dict with ``expected_profit``, ``variance`` (of the final
+    balance) and ``bust_probability``.
+    """
+    if first <= 0:
+        raise ValueError('bet must be positive')
+    table = bet_progression({'bet': first, 'progression': progression, 'limit': limit}, martingale)
+    # the table repeats its last stake from here on
+    tail = len(table) - 1
+    while tail and table[tail - 1] == table[tail]:
+        tail -= 1
+    if (table[:tail + 1] != np.round(table[:tail + 1])).any():
+        raise ValueError('exact odds need stakes that are whole multiples of the bet')
+    if initial_balance <= 0:
+        return {'expected_profit': 0.0, 'variance': 0.0, 'bust_probability': 1.0}
+    p = wheel_probabilities(bias)[[n for n in nums if 0 <= n <= 36]].sum()
+    q = 1 - p
+    trigger = max(break_n, 1)
+    # bankroll column j means balance initial + first * (j + k_min); j < 0 is bust
+    k_min = math.floor(-initial_balance / first) + 1
+    start = -k_min
+    # each completed streak needs at least trigger + 1 spins and wins at most
+    # the best stake-minus-earlier-losses of the table
+    lost_before = np.concatenate([[0], np.cumsum(table[:tail])])
+    best_win = max(int((table[:tail + 1] - lost_before).max()), 1)
+    width = start + horizon // (trigger + 1) * best_win + 1
+    # levels whose earlier losses already exceed any bankroll never hold mass
+    reachable = np.flatnonzero(lost_before >= width)
+    stakes = table[:reachable[0] + 1 if len(reachable) else tail + 1].astype(int)
+    top = len(stakes) - 1
+
+    # level rows are indexed by the bankroll the streak started from (plus
+    # pad), so a loss moves every level up one row unshifted and only the
+    # repeating top stake shifts its own row.  Column x of level k holds
+    # bankroll x - lost[k], a win lands on x + gain[k], and mass arriving
+    # below lost[k] is bust; it can only arrive in a band one stake wide.
+    lost = lost_before[:len(stakes)].astype(int)
+    gain = stakes - lost
+    pad = max(int(gain.max()), 0)
+    cols = pad + width + max(int(-gain.min()), 0)
+    win_index = (np.arange(len(stakes)) * cols + pad - gain)[:, None] + np.arange(width)
+    band_top = pad + lost
+    band_low = band_top - np.concatenate([[0], stakes[:-1]])
+    band_low[top] = min(band_low[top], band_top[top] - stakes[top])
+    band = np.concatenate([np.arange(k * cols + max(low, 0), k * cols + min(high, cols))
+                           for k, (low, high) in enumerate(zip(band_low, band_top))]).astype(np.intp)
+    band = band[np.argsort(band % cols, kind='stable')]
+    band_cols = band % cols
+    gaps = np.zeros((trigger, width))
+    levels = np.zeros((len(stakes), cols))
+    flat = levels.reshape(-1)
+    busted = np.zeros(len(band))
+    gaps[0, start] = 1.0
+    # bankrolls above front are empty after `since` spins; any streak left
+    # open then can win once before the next needs trigger + 1 spins
+    front, since, reach = start, 0, 0
+    for t in range(horizon):
+        hi = min(width, front + ((t + 1 - since) // (trigger + 1) + reach) * best_win + 1)
+        g = gaps[:, :hi]
+        m = levels[:, :pad + hi]
+        won = levels.take(win_index[:, :hi]).sum(axis=0)
+        repeat = m[top, stakes[top]:].copy()
+        m[1:] = m[:-1]
+        m[0, pad:] = g[-1]
+        m[top, :len(repeat)] += repeat
+        m *= q
+        g[1:], g[0] = q * g[:-1], p * (g.sum(axis=0) + won)
+        arrived = band[:band_cols.searchsorted(pad + hi)]
+        busted[:len(arrived)] += flat[arrived]
+        flat[arrived] = 0.0
+        if t % 64 == 63:
+            # drop mass too small to matter before it turns subnormal
+            gaps[gaps < 1e-200] = 0.0
+            levels[levels < 1e-200] = 0.0
+            if gaps.sum() + levels.sum() < EXACT_ODDS_TOLERANCE:
+                break
+            held = np.flatnonzero(gaps.any(axis=0) | levels[:, pad:pad + width].any(axis=0))
+            front, since, reach = (held[-1] if len(held) else 0), t + 1, 1
+
+    balance = initial_balance + first * (np.arange(width) + k_min)
+    level_balance = initial_balance + first * (np.arange(cols) - pad - lost[:, None] + k_min)
+    bust_balance = level_balance.take(band)
+    alive = gaps.sum(axis=0)
+    mean = alive @ balance + (levels * level_balance).sum() + busted @ bust_balance
+    second = alive @ balance ** 2 + (levels * level_balance ** 2).sum() + busted @ bust_balance ** 2
+    return {
+        'expected_profit': float(mean - initial_balance),
+        'variance': float(max(second - mean ** 2, 0.0)),
+        'bust_probability': float(np.clip(busted.sum(), 0.0, 1.0)),
+    }
+
+def decimate(values, start, stop, buckets):
+    """Pick the points of ``values[start:stop]`` worth drawing at ``buckets`` pixels.
+
+    Keeps the min and max of every bucket, so global extremes survive, plus
+    the peak and trough of the largest drawdown.  Returns ``(x, y)`` arrays.
+    """
+    segment = values[start:stop]
+    n = len(segment)
+    if n <= 2 * buckets:
+        x = np.arange(start, stop)
+        return x, values[x]
+    size = -(-n // buckets)
+    full = n - n % size
+    blocks = segment[:full].reshape(-1, size)
+    base = np.arange(0, full, size)
+    keep = [base + blocks.argmin(axis=1), base + blocks.argmax(axis=1), [0, n - 1]]
+    if full < n:
+        keep.append([full + segment[full:].argmin(), full + segment[full:].argmax()])
+    trough = int(np.argmax(np.maximum.accumulate(segment) - segment))
+    keep.append([int(np.argmax(segment[:trough + 1])), trough])
+    x = np.unique(np.concatenate(keep)) + start
+    return x, values[x]
+
+
+ROUND_COLUMNS = ['Round', 'Number', 'Bet Placed?', 'Amount', 'WIN/LOSS', 'Total Balance',
+                 'Total Profit', 'Total Loss']
+
+
+def rounds_frame(spins, amount, change, initial_balance):
+    """Build simulate's ``(balance, history, rounds_df)`` from per-round totals."""
+    balance = initial_balance + np.cumsum(change)
+    history = [initial_balance] + balance.tolist()
+    df = pd.DataFrame({
+        'Round': np.arange(1, len(spins) + 1),
+        'Number': spins,
+        'Bet Placed?': amount != 0,
+        'Amount': amount,
+        'WIN/LOSS': change,
+        'Total Balance': balance,
+        'Total Profit': np.cumsum(np.maximum(change, 0)),
+        'Total Loss': np.cumsum(np.maximum(-change, 0)),
+    })
+    return history[-1], history, df
+
+
+def iter_spin_chunks(path, chunksize=STREAM_CHUNK_ROWS):
+    """Yield the spins of a CSV or ``.spins`` file as arrays of ``chunksize`` rows."""
+    if spin_format.is_spin_file(path):
+        spins = spin_format.open_spins(path).spins
+        for start in range(0, len(spins), chunksize):
+            yield spins[start:start + chunksize]
+        return
+    for chunk in pd.read_csv(path, usecols=['Number'], chunksize=chunksize):
+        # same blank handling and validation as spin_format.load_numbers
+        yield spin_format.number_column(chunk['Number'], path)
+
+
+def _bucket_extremes(x, y, width):
+    """Keep the lowest and highest point of every ``width``-round bucket of ``x``."""
+    group = x // width
+    order = np.lexsort((y, group))
+    bounds = np.flatnonzero(np.diff(group[order]))
+    keep = np.unique(np.concatenate([order[bounds], order[bounds + 1], order[[0, -1]]]))
+    return x[keep], y[keep]
+
+
+def simulate_stream(chunks, bets, break_n, martingale, initial_balance=0, log_path=None,
+                    graph_buckets=None):
+    """Constant-memory variant of ``simulate`` over an iterable of spin chunks.
+
+    Bet state is carried between chunks, so the result is the same as running
+    ``simulate`` on the concatenated spins.  Only running aggregates are kept.
+    With ``log_path`` the rounds table is appended to that CSV chunk by chunk.
+    With ``graph_buckets`` the balance curve is decimated as it streams, like
+    :func:`decimate`: the min and max of buckets whose width doubles whenever
+    more than ``4 * graph_buckets`` points are kept, plus the largest
+    drawdown and the last round, go to ``'Graph'`` as ``(rounds, balances)``.
+    Returns a dict of the aggregates.
+    """
+    matrix = membership_matrix(bets)
+    first = np.array([b['bet'] for b in bets], dtype=float)
+    progression = bet_progressions(bets, martingale)
+    misses = np.zeros(len(bets), dtype=np.int64)
+    summary = {
+        'Rounds': 0, 'Hits': 0, 'Final Balance': initial_balance,
+        'Min Balance': initial_balance, 'Max Balance': initial_balance,
+        'Total Profit': 0, 'Total Loss': 0,
+    }
+    graph_x, graph_y, width = np.zeros(1, dtype=np.int64), np.array([float(initial_balance)]), 1
+    peak, peak_at = float(initial_balance), 0
+    # depth, then (round, balance) of the largest drawdown's peak and trough
+    drawdown = (0.0, (0, peak), (0, peak))
+    for chunk in chunks:
+        spins = np.asarray(chunk)
+        n = len(spins)
+        if not n:
+            continue
+        hits = spin_hits(spins, matrix)
+        stakes, profits = bet_trajectories(hits, first, break_n, progression, misses)
+        last = n - 1 - np.argmax(hits[::-1], axis=0)
+        misses = np.where(hits.any(axis=0), n - 1 - last, misses + n)
+
+        amount = stakes.sum(axis=1)
+        change = profits.sum(axis=1)
+        balance = summary['Final Balance'] + np.cumsum(change)
+        total_profit = summary['Total Profit'] + np.cumsum(np.maximum(change, 0))
+        total_loss = summary['Total Loss'] + np.cumsum(np.maximum(-change, 0))
+        if log_path is not None:
+            pd.DataFrame({
+                'Round': np.arange(summary['Rounds'] + 1, summary['Rounds'] + n + 1),
+                'Number': spins,
+                'Bet Placed?': amount != 0,
+                'Amount': amount,
+                'WIN/LOSS': change,
+                'Total Balance': balance,
+                'Total Profit': total_profit,
+                'Total Loss': total_loss,
+            }).to_csv(log_path, mode='w' if summary['Rounds'] == 0 else 'a',
+                      header=summary['Rounds'] == 0, index=False)
+        if graph_buckets:
+            rounds = np.arange(summary['Rounds'] + 1, summary['Rounds'] + n + 1)
+            graph_x, graph_y = _bucket_extremes(np.concatenate([graph_x, rounds]),
+                                                np.concatenate([graph_y, balance]), width)
+            while len(graph_x) > 4 * graph_buckets:
+                width *= 2
+                graph_x, graph_y = _bucket_extremes(graph_x, graph_y, width)
+            running = np.maximum(np.maximum.accumulate(balance), peak)
+            trough = int(np.argmax(running - balance))
+            if running[trough] - balance[trough] > drawdown[0]:
+                top = int(np.argmax(balance[:trough + 1]))
+                start = (int(rounds[top]), float(balance[top])) if balance[top] > peak else (peak_at, peak)
+                drawdown = (running[trough] - balance[trough], start, (int(rounds[trough]), float(balance[trough])))
+            top = int(np.argmax(balance))
+            if balance[top] > peak:
+                peak, peak_at = float(balance[top]), int(rounds[top])
+        summary['Rounds'] += n
+        summary['Hits'] += int(hits.any(axis=1).sum())
+        summary['Final Balance'] = float(balance[-1])
+        summary['Min Balance'] = min(summary['Min Balance'], float(balance.min()))
+        summary['Max Balance'] = max(summary['Max Balance'], float(balance.max()))
+        summary['Total Profit'] = float(total_profit[-1])
+        summary['Total Loss'] = float(total_loss[-1])
+    if graph_buckets:
+        extra = [(0, float(initial_balance)), drawdown[1], drawdown[2],
+                 (summary['Rounds'], summary['Final Balance'])]
+        x = np.concatenate([graph_x, [r for r, _ in extra]])
+        y = np.concatenate([graph_y, [b for _, b in extra]])
+        x, keep = np.unique(x, return_index=True)
+        summary['Graph'] = (x, y[keep])
+    return summary
+
+
+def file_digest(path):
+    """Return the SHA-1 of a file's contents."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TrajectoryCache:
+    """LRU cache of parsed spin files and per-bet stake/profit trajectories.
+
+    A strategy's result is the sum of independent per-bet trajectories, so
+    toggling one group only has to simulate that group.  Trajectories are
+    keyed by (file content hash, bet numbers, stake, progression, break_n) and
+    the least recently used entries are evicted once the arrays held exceed
+    ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes=TRAJECTORY_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.files = {}
+        self.nbytes = 0
+
+    def load_spins(self, path):
+        """Return ``(digest, spins)`` for a CSV, parsing it only when it changed."""
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if key not in self.files:
+            self.files = {key: (file_digest(path), spin_format.load_numbers(path))}
+        return self.files[key]
+
+    def _get(self, key):
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def _put(self, key, value):
+        self.entries[key] = value
+        self.nbytes += sum(a.nbytes for a in value)
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            self.nbytes -= sum(a.nbytes for a in old)
+
+    def trajectory(self, digest, spins, bet, break_n, martingale):
+        """Return the cached ``(stakes, profits)`` arrays of one bet."""
+        progression = bet_progression(bet, martingale)
+        key = (digest, tuple(sorted(bet['nums'])), bet['bet'], progression.tobytes(), break_n)
+        value = self._get(key)
+        if value is None:
+            matrix = membership_matrix([bet])
+            stakes, profits = bet_trajectories(spin_hits(spins, matrix), [bet['bet']],
+                                               break_n, progression)
+            value = (stakes[:, 0], profits[:, 0])
+            self._put(key, value)
+        return value
+
+    def simulate(self, digest, spins, bets, break_n, martingale, initial_balance=0):
+        """Same result as ``StrategyBuilder.simulate_numpy`` built from cached bets."""
+        amount = np.zeros(len(spins))
+        change = np.zeros(len(spins))
+        for b in bets:
+            stakes, profits = self.trajectory(digest, spins, b, break_n, martingale)
+            amount += stakes
+            change += profits
+        return rounds_frame(spins, amount, change, initial_balance)
+
 def num_color(n: int) -> str:
     if n == 0:
         return 'green'
@@ -94,6 +882,95 @@ def sector_color(n: int) -> str:
         return 'blue'
     return 'orange'
 
+class RoundsView(ttk.Frame):
+    """Treeview that only ever holds the visible slice of a rounds DataFrame.
+
+    Columns are kept as arrays and the rows shown are an index array into
+    them, so scrolling, filtering and jumping never touch more than a page of
+    widgets.  Colour and win/loss tags are looked up per page from arrays
+    computed once up front.
+    """
+
+    def __init__(self, master, df: pd.DataFrame, color_of, page_rows=ROUNDS_PAGE_ROWS):
+        super().__init__(master)
+        self.pack(fill='both', expand=True)
+        self.columns = list(df.columns)
+        self.values = [df[col].to_numpy() for col in self.columns]
+        self.rounds = df['Round'].to_numpy()
+        self.change = df['WIN/LOSS'].to_numpy()
+        self.placed = df['Bet Placed?'].to_numpy(dtype=bool)
+        numbers = df['Number'].to_numpy()
+        palette = np.array([color_of(n) for n in range(37)])
+        valid = (numbers >= 0) & (numbers <= 36)
+        self.colors = np.where(valid, palette[np.where(valid, numbers, 0).astype(np.intp)], 'black')
+        self.outcomes = np.where(self.change >= 0, 'win', 'loss')
+        self.index = np.arange(len(df))
+        self.page_rows = page_rows
+        self.offset = 0
+
+        self.tree = ttk.Treeview(self, columns=self.columns, show='headings', height=page_rows)
+        self.vsb = ttk.Scrollbar(self, orient='vertical', command=self.on_scroll)
+        hsb = ttk.Scrollbar(self, orient='horizontal', command=self.tree.xview)
+        self.tree.configure(xscrollcommand=hsb.set)
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.vsb.grid(row=0, column=1, sticky='ns')
+        hsb.grid(row=1, column=0, sticky='ew')
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        for col in self.columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, anchor='center')
+        self.tree.tag_configure('red', foreground='red')
+        self.tree.tag_configure('black', foreground='black')
+        self.tree.tag_configure('green', foreground='green')
+        self.tree.tag_configure('blue', foreground='blue')
+        self.tree.tag_configure('orange', foreground='orange')
+        self.tree.tag_configure('win', background='#ccffcc')
+        self.tree.tag_configure('loss', background='#ffcccc')
+
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll_to(self.offset - e.delta // 120 * 3))
+        self.tree.bind('<Button-4>', lambda e: self.scroll_to(self.offset - 3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_to(self.offset + 3))
+        self.render()
+
+    def render(self):
+        self.tree.delete(*self.tree.get_children())
+        rows = self.index[self.offset:self.offset + self.page_rows]
+        page = [values[rows].tolist() for values in self.values]
+        for i, row in enumerate(rows):
+            self.tree.insert('', 'end', values=[col[i] for col in page],
+                             tags=(str(self.colors[row]), str(self.outcomes[row])))
+        total = max(len(self.index), 1)
+        self.vsb.set(self.offset / total, min(self.offset + self.page_rows, total) / total)
+
+    def scroll_to(self, offset):
+        self.offset = int(min(max(offset, 0), max(len(self.index) - self.page_rows, 0)))
+        self.render()
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(float(amount) * len(self.index))
+        elif unit == 'pages':
+            self.scroll_to(self.offset + int(amount) * self.page_rows)
+        else:
+            self.scroll_to(self.offset + int(amount))
+
+    def set_filter(self, bets_only=False, min_loss=None):
+        """Show only rounds with a bet placed and/or losing more than ``min_loss``."""
+        mask = np.ones(len(self.rounds), dtype=bool)
+        if bets_only:
+            mask &= self.placed
+        if min_loss is not None:
+            mask &= self.change < -min_loss
+        self.index = np.flatnonzero(mask)
+        self.scroll_to(0)
+
+    def jump_to(self, round_number):
+        """Scroll to the first shown round at or after ``round_number``."""
+        self.scroll_to(np.searchsorted(self.rounds[self.index], round_number))
+
+
 class StrategyBuilder(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -103,6 +980,7 @@ class StrategyBuilder(tk.Tk):
         self.use_martingale = tk.BooleanVar(value=True)
         self.initial_balance = tk.DoubleVar(value=100.0)
         self.min_bet = tk.IntVar(value=1)
+        self.engine = tk.StringVar(value='numpy')
 
         self.num_vars = []
         self.red_var = tk.BooleanVar()
@@ -122,8 +1000,31 @@ class StrategyBuilder(tk.Tk):
         self.tiers_var = tk.BooleanVar()
         self.split_entry = tk.StringVar()
         self.corner_entry = tk.StringVar()
+        self.sweep_breaks = tk.StringVar(value='1-6')
+        self.sweep_bets = tk.StringVar(value='1-3')
+        self.sweep_both_martingale = tk.BooleanVar(value=True)
+        self.mc_sessions = tk.IntVar(value=10000)
+        self.mc_spins = tk.IntVar(value=500)
+        self.mc_seed = tk.IntVar(value=0)
+        self.mc_bias = tk.StringVar()
+        self.exact_horizon = tk.IntVar(value=1000)
+        self.table_limit = tk.DoubleVar(value=0.0)
+        self.group_progressions = {}
+        self.progression_group = tk.StringVar(value='RED_NUMBERS')
+        self.progression_name = tk.StringVar(value='Fibonacci')
+        self.custom_progression = tk.StringVar(value='1,2,4')
+        self.progression_summary = tk.StringVar(value='All groups use the default')
+        self.trajectory_cache = TrajectoryCache()
+        self.streaming = tk.BooleanVar(value=False)
+        # scratch files such as the streamed round log; removed on close
+        self.work_dir = tempfile.TemporaryDirectory(prefix='strategy_builder_')
+        self.round_log = os.path.join(self.work_dir.name, 'rounds.csv')
+        # exact odds run in a worker process so the window stays responsive
+        self.odds_pool = None
+        self.odds_future = None
 
         self.create_widgets()
+        self.protocol('WM_DELETE_WINDOW', self.close)
 
     def create_widgets(self):
         file_frame = ttk.Frame(self)
@@ -168,6 +1069,19 @@ class StrategyBuilder(tk.Tk):
         ttk.Entry(bet_frame, textvariable=self.corner_entry, width=25).grid(row=1, column=2, columnspan=2, sticky='w')
 
 
+        prog_frame = ttk.LabelFrame(self, text=f'Progressions ({DEFAULT_PROGRESSION} uses the Martingale checkbox)')
+        prog_frame.pack(fill='x', pady=5)
+        ttk.Combobox(prog_frame, textvariable=self.progression_group, width=14, state='readonly',
+                     values=list(BET_GROUPS) + ['NUMBERS', 'SPLITS', 'CORNERS']).grid(row=0, column=0)
+        ttk.Combobox(prog_frame, textvariable=self.progression_name, width=12, state='readonly',
+                     values=[DEFAULT_PROGRESSION] + list(PROGRESSIONS) + ['Custom']).grid(row=0, column=1, padx=5)
+        ttk.Label(prog_frame, text='Custom ex: 1,2,4').grid(row=0, column=2)
+        ttk.Entry(prog_frame, textvariable=self.custom_progression, width=12).grid(row=0, column=3)
+        ttk.Button(prog_frame, text='Set', command=self.set_group_progression).grid(row=0, column=4, padx=5)
+        ttk.Label(prog_frame, text='Table limit (0 = none)').grid(row=0, column=5, padx=(10,0))
+        ttk.Entry(prog_frame, textvariable=self.table_limit, width=7).grid(row=0, column=6)
+        ttk.Label(prog_frame, textvariable=self.progression_summary).grid(row=1, column=0, columnspan=7, sticky='w')
+
         opt_frame = ttk.Frame(self)
         opt_frame.pack(pady=5)
         ttk.Label(opt_frame, text='Break after').grid(row=0, column=0)
@@ -178,75 +1092,110 @@ class StrategyBuilder(tk.Tk):
         ttk.Entry(opt_frame, textvariable=self.initial_balance, width=7).grid(row=0, column=5)
         ttk.Label(opt_frame, text='Min Bet').grid(row=0, column=6, padx=(10,0))
         ttk.Combobox(opt_frame, textvariable=self.min_bet, values=list(range(1,11)), width=5, state='readonly').grid(row=0, column=7)
+        ttk.Label(opt_frame, text='Engine').grid(row=0, column=8, padx=(10,0))
+        ttk.Combobox(opt_frame, textvariable=self.engine, values=['numpy', 'python'], width=7, state='readonly').grid(row=0, column=9)
+        ttk.Checkbutton(opt_frame, text='Stream (low memory)', variable=self.streaming).grid(row=0, column=10, padx=10)
+
+        sweep_frame = ttk.LabelFrame(self, text='Sweep (all combinations of the selected groups)')
+        sweep_frame.pack(fill='x', pady=5)
+        ttk.Label(sweep_frame, text='Break values ex: 1-6').grid(row=0, column=0, sticky='w')
+        ttk.Entry(sweep_frame, textvariable=self.sweep_breaks, width=10).grid(row=0, column=1, sticky='w')
+        ttk.Label(sweep_frame, text='Min bets ex: 1,2,5').grid(row=0, column=2, sticky='w', padx=(10,0))
+        ttk.Entry(sweep_frame, textvariable=self.sweep_bets, width=10).grid(row=0, column=3, sticky='w')
+        ttk.Checkbutton(sweep_frame, text='Try with and without Martingale',
+                        variable=self.sweep_both_martingale).grid(row=0, column=4, padx=10)
 
-        ttk.Button(self, text='Run Test', command=self.run_test).pack(pady=5)
+        mc_frame = ttk.LabelFrame(self, text='Monte Carlo / Exact odds (synthetic European wheel)')
+        mc_frame.pack(fill='x', pady=5)
+        ttk.Label(mc_frame, text='Sessions').grid(row=0, column=0, sticky='w')
+        ttk.Entry(mc_frame, textvariable=self.mc_sessions, width=8).grid(row=0, column=1, sticky='w')
+        ttk.Label(mc_frame, text='Spins').grid(row=0, column=2, sticky='w', padx=(10,0))
+        ttk.Entry(mc_frame, textvariable=self.mc_spins, width=6).grid(row=0, column=3, sticky='w')
+        ttk.Label(mc_frame, text='Seed').grid(row=0, column=4, sticky='w', padx=(10,0))
+        ttk.Entry(mc_frame, textvariable=self.mc_seed, width=6).grid(row=0, column=5, sticky='w')
+        ttk.Label(mc_frame, text='Bias ex: 17:2,5:1.5').grid(row=1, column=0, columnspan=2, sticky='w')
+        ttk.Entry(mc_frame, textvariable=self.mc_bias, width=25).grid(row=1, column=2, columnspan=4, sticky='w')
+        ttk.Label(mc_frame, text='Exact odds horizon').grid(row=2, column=0, columnspan=2, sticky='w')
+        ttk.Entry(mc_frame, textvariable=self.exact_horizon, width=8).grid(row=2, column=2, sticky='w')
+        ttk.Label(mc_frame, text='spins (about 1 s per 10,000 with Martingale)').grid(
+            row=2, column=3, columnspan=3, sticky='w')
+
+        run_frame = ttk.Frame(self)
+        run_frame.pack(pady=5)
+        ttk.Button(run_frame, text='Run Test', command=self.run_test).pack(side='left', padx=5)
+        ttk.Button(run_frame, text='Sweep', command=self.run_sweep).pack(side='left', padx=5)
+        ttk.Button(run_frame, text='Monte Carlo', command=self.run_monte_carlo).pack(side='left', padx=5)
+        ttk.Button(run_frame, text='Exact odds', command=self.run_exact_odds).pack(side='left', padx=5)
         ttk.Button(self, text='Show Bet Table', command=self.show_bets_table).pack(pady=5)
         self.result_text = tk.Text(self, height=10, width=80, state='disabled')
         self.result_text.pack(padx=5, pady=5)
 
     def browse_file(self):
-        path = filedialog.askopenfilename(filetypes=[('CSV files','*.csv')])
+        path = filedialog.askopenfilename(filetypes=[('Session files', '*.csv *.spins'), ('CSV files','*.csv')])
         if path:
             self.file_path.set(path)
 
     def parse_pairs(self, text, count):
-        pairs = []
-        if not text:
-            return pairs
-        for item in text.replace(',', ' ').split():
-            nums = item.split('-')
-            if len(nums) != count:
-                continue
-            try:
-                vals = [int(n) for n in nums]
-            except ValueError:
-                continue
-            if all(0 <= n <= 36 for n in vals):
-                pairs.append(set(vals))
-        return pairs
+        return parse_pairs(text, count)
 
-    def gather_bets(self):
-        bet_amt = self.min_bet.get()
-        bets = []
+    def selected_groups(self):
+        """Return the selected bet groups as an ordered name -> numbers dict."""
+        groups = {}
         nums = {n for n, var in enumerate(self.num_vars) if var.get()}
         if nums:
-            bets.append({'nums': nums, 'bet': bet_amt})
-        if self.red_var.get():
-            bets.append({'nums': RED_NUMBERS, 'bet': bet_amt})
-        if self.black_var.get():
-            bets.append({'nums': BLACK_NUMBERS, 'bet': bet_amt})
-        if self.even_var.get():
-            bets.append({'nums': EVEN_NUMBERS, 'bet': bet_amt})
-        if self.odd_var.get():
-            bets.append({'nums': ODD_NUMBERS, 'bet': bet_amt})
-        if self.low_var.get():
-            bets.append({'nums': LOW_NUMBERS, 'bet': bet_amt})
-        if self.high_var.get():
-            bets.append({'nums': HIGH_NUMBERS, 'bet': bet_amt})
-        if self.dozen1_var.get():
-            bets.append({'nums': DOZEN_1, 'bet': bet_amt})
-        if self.dozen2_var.get():
-            bets.append({'nums': DOZEN_2, 'bet': bet_amt})
-        if self.dozen3_var.get():
-            bets.append({'nums': DOZEN_3, 'bet': bet_amt})
-        if self.column1_var.get():
-            bets.append({'nums': COLUMN_1, 'bet': bet_amt})
-        if self.column2_var.get():
-            bets.append({'nums': COLUMN_2, 'bet': bet_amt})
-        if self.column3_var.get():
-            bets.append({'nums': COLUMN_3, 'bet': bet_amt})
-        if self.voisins_var.get():
-            bets.append({'nums': VOISINS, 'bet': bet_amt})
-        if self.orphelins_var.get():
-            bets.append({'nums': ORPHELINS, 'bet': bet_amt})
-        if self.tiers_var.get():
-            bets.append({'nums': TIERS, 'bet': bet_amt})
+            groups['NUMBERS ' + ','.join(map(str, sorted(nums)))] = nums
+        checked = [
+            ('RED_NUMBERS', self.red_var), ('BLACK_NUMBERS', self.black_var),
+            ('EVEN_NUMBERS', self.even_var), ('ODD_NUMBERS', self.odd_var),
+            ('LOW_NUMBERS', self.low_var), ('HIGH_NUMBERS', self.high_var),
+            ('DOZEN_1', self.dozen1_var), ('DOZEN_2', self.dozen2_var),
+            ('DOZEN_3', self.dozen3_var), ('COLUMN_1', self.column1_var),
+            ('COLUMN_2', self.column2_var), ('COLUMN_3', self.column3_var),
+            ('VOISINS', self.voisins_var), ('ORPHELINS', self.orphelins_var),
+            ('TIERS', self.tiers_var),
+        ]
+        for name, var in checked:
+            if var.get():
+                groups[name] = BET_GROUPS[name]
         for pair in self.parse_pairs(self.split_entry.get(), 2):
-            bets.append({'nums': pair, 'bet': bet_amt})
+            groups['SPLIT ' + '-'.join(map(str, sorted(pair)))] = pair
         for quad in self.parse_pairs(self.corner_entry.get(), 4):
-            bets.append({'nums': quad, 'bet': bet_amt})
+            groups['CORNER ' + '-'.join(map(str, sorted(quad)))] = quad
+        return groups
+
+    def gather_bets(self):
+        bet_amt = self.min_bet.get()
+        limit = self.table_limit.get()
+        bets = []
+        for name, nums in self.selected_groups().items():
+            bet = {'nums': nums, 'bet': bet_amt}
+            progression = self.group_progressions.get(progression_key(name))
+            if progression:
+                bet['progression'] = progression
+            if limit > 0:
+                bet['limit'] = limit
+            bets.append(bet)
         return bets
 
+    def set_group_progression(self):
+        """Assign the chosen progression to the chosen group."""
+        name = self.progression_group.get()
+        progression = self.progression_name.get()
+        if progression == 'Custom':
+            try:
+                progression = tuple(float(x) for x in self.custom_progression.get().replace(',', ' ').split())
+                compile_progression(progression)
+            except ValueError:
+                messagebox.showerror('Error', 'Custom multipliers must be positive numbers, ex: 1,2,4')
+                return
+        if progression == DEFAULT_PROGRESSION:
+            self.group_progressions.pop(name, None)
+        else:
+            self.group_progressions[name] = progression
+        self.progression_summary.set(', '.join(
+            f'{group}: {prog if isinstance(prog, str) else "Custom " + "-".join(f"{x:g}" for x in prog)}'
+            for group, prog in self.group_progressions.items()) or 'All groups use the default')
+
     def estimate_total_bet_amount(self) -> float:
         """Estimate the starting bet amount given the selected options."""
         bet = self.min_bet.get()
@@ -298,32 +1247,46 @@ class StrategyBuilder(tk.Tk):
         return total
 
 
-    def run_test(self):
+    def load_spins(self):
+        """Return ``(digest, spins)`` of the selected CSV, or report why not."""
         path = self.file_path.get()
         if not path:
             messagebox.showerror('Error', 'Please select a CSV file')
-            return
+            return None
         try:
-            df = pd.read_csv(path)
+            return self.trajectory_cache.load_spins(path)
+        except KeyError:
+            messagebox.showerror('Error', 'CSV must have a Number column')
         except Exception as e:
             messagebox.showerror('Error', f'Failed to read CSV: {e}')
+        return None
+
+    def run_test(self):
+        if self.streaming.get():
+            self.run_stream()
             return
-        if 'Number' not in df.columns:
-            messagebox.showerror('Error', 'CSV must have a Number column')
+        loaded = self.load_spins()
+        if loaded is None:
             return
-        numbers = df['Number'].tolist()
+        digest, numbers = loaded
         bets = self.gather_bets()
         if not bets:
             messagebox.showerror('Error', 'Please select at least one number or group')
             return
         est_total = self.estimate_total_bet_amount()
-        profit, history, rounds_df = self.simulate(
-            numbers, bets, self.break_n.get(),
-            self.use_martingale.get(), self.initial_balance.get())
+        if self.engine.get() == 'numpy':
+            profit, history, rounds_df = self.trajectory_cache.simulate(
+                digest, numbers, bets, self.break_n.get(),
+                self.use_martingale.get(), self.initial_balance.get())
+        else:
+            profit, history, rounds_df = self.simulate(
+                numbers.tolist(), bets, self.break_n.get(),
+                self.use_martingale.get(), self.initial_balance.get(),
+                engine=self.engine.get())
 
-        hits = sum(1 for n in numbers if any(n in b['nums'] for b in bets))
+        hits = int(spin_hits(numbers, membership_matrix(bets)).any(axis=1).sum())
 
-        rate = hits / len(numbers) * 100 if numbers else 0
+        rate = hits / len(numbers) * 100 if len(numbers) else 0
         self.result_text.config(state='normal')
         self.result_text.delete('1.0', tk.END)
         self.result_text.insert(
@@ -340,67 +1303,274 @@ class StrategyBuilder(tk.Tk):
         self.show_graph(history)
         self.show_rounds(rounds_df)
 
+    def run_stream(self):
+        """Run the test in constant memory, logging rounds to ``self.round_log``."""
+        path = self.file_path.get()
+        if not path:
+            messagebox.showerror('Error', 'Please select a CSV file')
+            return
+        bets = self.gather_bets()
+        if not bets:
+            messagebox.showerror('Error', 'Please select at least one number or group')
+            return
+        est_total = self.estimate_total_bet_amount()
+        try:
+            summary = simulate_stream(
+                iter_spin_chunks(path), bets, self.break_n.get(),
+                self.use_martingale.get(), self.initial_balance.get(),
+                log_path=self.round_log, graph_buckets=GRAPH_BUCKETS)
+        except Exception as e:
+            messagebox.showerror('Error', f'Failed to read CSV: {e}')
+            return
 
-    def show_graph(self, history):
-        fig = plt.Figure(figsize=(6, 3))
-        ax = fig.add_subplot(111)
-        ax.plot(range(len(history)), history, marker='o')
-        ax.set_xlabel('Round')
-        ax.set_ylabel('Balance')
-        ax.set_title('Balance per Round')
+        profit = summary['Final Balance']
+        rounds = summary['Rounds']
+        rate = summary['Hits'] / rounds * 100 if rounds else 0
+        self.result_text.config(state='normal')
+        self.result_text.delete('1.0', tk.END)
+        self.result_text.insert(
+            tk.END,
+            f'Final Balance: {profit:.2f}\n'
+            f'Profit/Loss: {profit - self.initial_balance.get():.2f}\n'
+            f'Hits: {summary["Hits"]}/{rounds} ({rate:.2f}%)\n'
+            f'Max balance: {summary["Max Balance"]:.2f}\nMin balance: {summary["Min Balance"]:.2f}\n'
+            f'Estimated Starting Bet: {est_total:.2f}\n')
+        self.result_text.config(state='disabled')
+
+        if rounds:
+            x, y = summary['Graph']
+            self.show_graph(y, rounds=x)
+        self.show_round_log()
 
+    def show_round_log(self):
+        """Offer the streamed round log for saving without loading it."""
         top = tk.Toplevel(self)
-        top.title('Balance Graph')
-        canvas = FigureCanvasTkAgg(fig, master=top)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
+        top.title('Round Log')
+        ttk.Label(top, text=f'Rounds were written to {self.round_log}').pack(padx=5, pady=5)
 
-    def show_rounds(self, df: pd.DataFrame):
-        """Display dataframe of rounds in a scrollable tree view and allow saving."""
+        def save_csv():
+            path = filedialog.asksaveasfilename(
+                defaultextension='.csv', filetypes=[('CSV', '*.csv')])
+            if path:
+                shutil.copyfile(self.round_log, path)
+
+        ttk.Button(top, text='Save CSV', command=save_csv).pack(pady=5)
+
+    def run_sweep(self):
+        loaded = self.load_spins()
+        if loaded is None:
+            return
+        _, numbers = loaded
+        groups = self.selected_groups()
+        if not groups:
+            messagebox.showerror('Error', 'Please select at least one number or group')
+            return
+        if len(groups) > MAX_SWEEP_GROUPS:
+            messagebox.showerror('Error', f'Select at most {MAX_SWEEP_GROUPS} groups to sweep')
+            return
+        try:
+            breaks = parse_range(self.sweep_breaks.get())
+            stakes = parse_range(self.sweep_bets.get())
+        except ValueError:
+            messagebox.showerror('Error', 'Sweep ranges must look like 1-6 or 1,2,5')
+            return
+        if not breaks or not stakes:
+            messagebox.showerror('Error', 'Please enter break values and min bets to sweep')
+            return
+        martingale = (True, False) if self.sweep_both_martingale.get() else (self.use_martingale.get(),)
+        names = list(groups)
+        combos = [c for r in range(1, len(names) + 1) for c in itertools.combinations(names, r)]
+        progressions = {name: self.group_progressions.get(progression_key(name)) for name in names}
+        limit = self.table_limit.get()
+        df = sweep(numbers, combos, breaks, stakes, martingale,
+                   self.initial_balance.get(), groups=groups,
+                   progressions=progressions, limit=limit if limit > 0 else None)
+        self.show_sweep(df)
+
+    def run_monte_carlo(self):
+        bets = self.gather_bets()
+        if not bets:
+            messagebox.showerror('Error', 'Please select at least one number or group')
+            return
+        try:
+            bias = parse_bias(self.mc_bias.get())
+        except ValueError as e:
+            messagebox.showerror('Error', f'Invalid bias: {e}')
+            return
+        summary, per_session = monte_carlo(
+            bets, self.break_n.get(), self.use_martingale.get(), self.initial_balance.get(),
+            sessions=self.mc_sessions.get(), spins=self.mc_spins.get(),
+            seed=self.mc_seed.get(), bias=bias)
+        self.result_text.config(state='normal')
+        self.result_text.delete('1.0', tk.END)
+        self.result_text.insert(
+            tk.END,
+            f'Sessions: {len(per_session)} x {self.mc_spins.get()} spins\n'
+            f'Probability of ruin: {summary.attrs["ruin_probability"] * 100:.2f}%\n'
+            f'Mean final balance: {per_session["Final Balance"].mean():.2f}\n'
+            f'{summary.round(2).to_string()}\n')
+        self.result_text.config(state='disabled')
+
+    def run_exact_odds(self):
+        bets = self.gather_bets()
+        if len(bets) != 1:
+            messagebox.showerror('Error', 'Exact odds need exactly one number or group selected')
+            return
+        try:
+            bias = parse_bias(self.mc_bias.get())
+        except ValueError as e:
+            messagebox.showerror('Error', f'Invalid bias: {e}')
+            return
+        if self.odds_future is not None and not self.odds_future.done():
+            messagebox.showinfo('Exact odds', 'Exact odds are still being computed')
+            return
+        horizon = self.exact_horizon.get()
+        if self.odds_pool is None:
+            self.odds_pool = ProcessPoolExecutor(max_workers=1)
+        self.odds_future = self.odds_pool.submit(
+            exact_odds, bets[0]['nums'], bets[0]['bet'], self.break_n.get(),
+            self.use_martingale.get(), self.initial_balance.get(), horizon, bias=bias,
+            progression=bets[0].get('progression'), limit=bets[0].get('limit'))
+        self.show_result(f'Computing exact odds over {horizon} spins...\n')
+        self.after(EXACT_ODDS_POLL_MS, self.show_exact_odds, self.odds_future, horizon)
+
+    def show_exact_odds(self, future, horizon):
+        """Show the result of ``future`` once the worker has finished it."""
+        if not future.done():
+            self.after(EXACT_ODDS_POLL_MS, self.show_exact_odds, future, horizon)
+            return
+        try:
+            odds = future.result()
+        except ValueError as e:
+            self.show_result('')
+            messagebox.showerror('Error', str(e))
+            return
+        self.show_result(
+            f'Exact odds over {horizon} spins (play stops at bust)\n'
+            f'Expected Profit/Loss: {odds["expected_profit"]:.2f}\n'
+            f'Std Dev of Final Balance: {math.sqrt(odds["variance"]):.2f}\n'
+            f'Bust Probability: {odds["bust_probability"] * 100:.2f}%\n')
+
+    def show_result(self, text):
+        self.result_text.config(state='normal')
+        self.result_text.delete('1.0', tk.END)
+        self.result_text.insert(tk.END, text)
+        self.result_text.config(state='disabled')
+
+    def close(self):
+        if self.odds_pool is not None:
+            self.odds_pool.shutdown(wait=False, cancel_futures=True)
+        self.work_dir.cleanup()
+        self.destroy()
+
+    def show_sweep(self, df: pd.DataFrame):
+        """Display the ranked sweep results and allow saving them."""
         top = tk.Toplevel(self)
-        top.title('Rounds with Bets')
+        top.title(f'Sweep Results ({len(df)} configurations)')
 
         frame = ttk.Frame(top)
         frame.pack(fill='both', expand=True)
-
         columns = list(df.columns)
         tree = ttk.Treeview(frame, columns=columns, show='headings')
         vsb = ttk.Scrollbar(frame, orient='vertical', command=tree.yview)
-        hsb = ttk.Scrollbar(frame, orient='horizontal', command=tree.xview)
-        tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-
+        tree.configure(yscrollcommand=vsb.set)
         tree.grid(row=0, column=0, sticky='nsew')
         vsb.grid(row=0, column=1, sticky='ns')
-        hsb.grid(row=1, column=0, sticky='ew')
-
         frame.rowconfigure(0, weight=1)
         frame.columnconfigure(0, weight=1)
-
         for col in columns:
             tree.heading(col, text=col)
             tree.column(col, anchor='center')
+        for row in df.head(SWEEP_ROWS_SHOWN).itertuples(index=False):
+            tree.insert('', 'end', values=[f'{v:.2f}' if isinstance(v, float) else v for v in row])
+
+        def save_csv():
+            path = filedialog.asksaveasfilename(
+                defaultextension='.csv', filetypes=[('CSV', '*.csv')])
+            if path:
+                df.to_csv(path, index=False)
+
+        ttk.Button(top, text='Save CSV', command=save_csv).pack(pady=5)
+
+    def show_graph(self, history, rounds=None):
+        """Plot the balance, decimated to the canvas width and redone on zoom.
+
+        ``rounds`` gives the round of every point of an already decimated
+        ``history``, as ``simulate_stream`` returns it; that graph is drawn
+        as is.
+        """
+        history = np.asarray(history, dtype=float)
+        fig = plt.Figure(figsize=(6, 3))
+        ax = fig.add_subplot(111)
+        if rounds is None:
+            x, y = decimate(history, 0, len(history), GRAPH_BUCKETS)
+        else:
+            x, y = np.asarray(rounds), history
+        line, = ax.plot(x, y, marker='o' if len(x) == x[-1] + 1 else None)
+        ax.set_xlabel('Round')
+        ax.set_ylabel('Balance')
+        ax.set_title('Balance per Round')
+
+        top = tk.Toplevel(self)
+        top.title('Balance Graph')
+        canvas = FigureCanvasTkAgg(fig, master=top)
+        NavigationToolbar2Tk(canvas, top).update()
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill='both', expand=True)
+
+        def redecimate(axes):
+            lo, hi = axes.get_xlim()
+            start = max(int(math.floor(lo)), 0)
+            stop = min(int(math.ceil(hi)) + 1, len(history))
+            if start >= stop:
+                return
+            buckets = max(canvas.get_tk_widget().winfo_width(), GRAPH_BUCKETS)
+            x, y = decimate(history, start, stop, buckets)
+            line.set_data(x, y)
+            line.set_marker('o' if len(x) == stop - start and len(x) <= GRAPH_BUCKETS else None)
+            canvas.draw_idle()
+
+        if rounds is None:
+            ax.callbacks.connect('xlim_changed', redecimate)
 
-        tree.tag_configure('red', foreground='red')
-        tree.tag_configure('black', foreground='black')
-        tree.tag_configure('green', foreground='green')
-        tree.tag_configure('blue', foreground='blue')
-        tree.tag_configure('orange', foreground='orange')
-        tree.tag_configure('win', background='#ccffcc')
-        tree.tag_configure('loss', background='#ffcccc')
+    def show_rounds(self, df: pd.DataFrame):
+        """Display dataframe of rounds in a virtualised tree view and allow saving."""
+        top = tk.Toplevel(self)
+        top.title('Rounds with Bets')
 
         use_sectors = any([self.voisins_var.get(),
                            self.orphelins_var.get(),
                            self.tiers_var.get()])
+        view = RoundsView(top, df, sector_color if use_sectors else num_color)
 
-        for _, row in df.iterrows():
-            values = [row[col] for col in columns]
-            if use_sectors:
-                color_tag = sector_color(row['Number'])
-            else:
-                color_tag = num_color(row['Number'])
-            change_tag = 'win' if row['WIN/LOSS'] >= 0 else 'loss'
-            tree.insert('', 'end', values=values, tags=(color_tag, change_tag))
+        controls = ttk.Frame(top)
+        controls.pack(fill='x', pady=5)
+        bets_only = tk.BooleanVar()
+        min_loss = tk.StringVar()
+        jump_to = tk.StringVar()
+
+        def apply_filter():
+            try:
+                loss = float(min_loss.get()) if min_loss.get().strip() else None
+            except ValueError:
+                messagebox.showerror('Error', 'Loss threshold must be a number', parent=top)
+                return
+            view.set_filter(bets_only.get(), loss)
+
+        def jump():
+            try:
+                view.jump_to(int(jump_to.get()))
+            except ValueError:
+                messagebox.showerror('Error', 'Round must be a whole number', parent=top)
 
+        ttk.Checkbutton(controls, text='Only rounds with bets', variable=bets_only,
+                        command=apply_filter).pack(side='left', padx=5)
+        ttk.Label(controls, text='Only losses >').pack(side='left')
+        ttk.Entry(controls, textvariable=min_loss, width=8).pack(side='left')
+        ttk.Button(controls, text='Filter', command=apply_filter).pack(side='left', padx=5)
+        ttk.Label(controls, text='Round').pack(side='left', padx=(15, 0))
+        ttk.Entry(controls, textvariable=jump_to, width=8).pack(side='left')
+        ttk.Button(controls, text='Go', command=jump).pack(side='left', padx=5)
 
         def save_csv():
             path = filedialog.asksaveasfilename(
@@ -427,12 +1597,24 @@ class StrategyBuilder(tk.Tk):
 
 
     @staticmethod
-    def simulate(spins, bets, break_n, martingale, initial_balance=0):
+    def simulate(spins, bets, break_n, martingale, initial_balance=0, engine='python'):
+        """Replay ``spins`` against ``bets`` and return ``(balance, history, rounds_df)``.
+
+        ``engine='python'`` steps one ``BetState`` per bet through every spin;
+        ``engine='numpy'`` computes the same result with array operations.
+        """
+        if engine == 'numpy':
+            return StrategyBuilder.simulate_numpy(spins, bets, break_n, martingale, initial_balance)
+        if engine != 'python':
+            raise ValueError(f'Unknown simulate engine: {engine}')
+
         class BetState:
-            def __init__(self, numbers, first):
+            def __init__(self, numbers, first, table=None):
                 self.numbers = numbers
                 self.first = first
+                self.table = table
                 self.bet = first
+                self.level = 0
                 self.gap = 0
                 self.betting = False
 
@@ -446,7 +1628,10 @@ class StrategyBuilder(tk.Tk):
                         self.gap = 0
                     else:
                         profit -= self.bet
-                        if martingale:
+                        if self.table is not None:
+                            self.level = min(self.level + 1, len(self.table) - 1)
+                            self.bet = self.first * self.table[self.level]
+                        elif martingale:
                             self.bet *= 2
                 else:
                     if num in self.numbers:
@@ -456,16 +1641,21 @@ class StrategyBuilder(tk.Tk):
                         if self.gap >= break_n:
                             self.betting = True
                             self.bet = self.first
+                            if self.table is not None:
+                                self.level = 0
+                                self.bet = self.first * self.table[0]
                 return profit
 
-        states = [BetState(b['nums'], b['bet']) for b in bets]
+        states = [BetState(b['nums'], b['bet'],
+                           bet_progression(b, martingale)
+                           if b.get('progression') or b.get('limit') else None)
+                  for b in bets]
         profit = initial_balance
         history = [initial_balance]
         rounds = []
         total_profit = 0
         total_loss = 0
         for idx, num in enumerate(spins, start=1):
-            bet_flag = any(state.betting for state in states)
             total_bet = sum(state.bet for state in states if state.betting)
             prev_profit = profit
             for state in states:
@@ -486,12 +1676,59 @@ class StrategyBuilder(tk.Tk):
                 'Total Profit': total_profit,
                 'Total Loss': total_loss
             })
-        df = pd.DataFrame(rounds)
+        df = pd.DataFrame(rounds, columns=ROUND_COLUMNS)
         return profit, history, df
 
+    @staticmethod
+    def simulate_numpy(spins, bets, break_n, martingale, initial_balance=0):
+        """NumPy engine for :meth:`simulate`.
+
+        Bet membership is a 37xK boolean matrix and the per-bet gap, stake and
+        betting state are arrays advanced together by :func:`bet_trajectories`.
+        Money columns are float64, so the output matches the Python engine
+        value for value as long as stakes stay within float64's exact integer
+        range (a Martingale on a single number can double past 2**53).
+        """
+        spins = np.asarray(spins)
+        matrix = membership_matrix(bets)
+        first = np.array([b['bet'] for b in bets], dtype=float)
+        progression = bet_progressions(bets, martingale)
+        amount = np.zeros(len(spins))
+        change = np.zeros(len(spins))
+        # advance bets in column blocks so (n, K) temporaries stay bounded
+        block = max(1, SIMULATE_BLOCK_CELLS // max(len(spins), 1))
+        for start in range(0, len(bets), block):
+            cols = slice(start, start + block)
+            stakes, profits = bet_trajectories(
+                spin_hits(spins, matrix[:, cols]), first[cols], break_n,
+                progression[cols] if isinstance(progression, np.ndarray) else progression)
+            amount += stakes.sum(axis=1)
+            change += profits.sum(axis=1)
+        return rounds_frame(spins, amount, change, initial_balance)
+
+
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Roulette strategy tester. Opens the GUI without a command.')
+    commands = parser.add_subparsers(dest='command')
+    run = commands.add_parser('run', help='evaluate a strategy spec on every CSV in a directory')
+    run.add_argument('spec', help='JSON strategy spec')
+    run.add_argument('directory', help='directory of session CSVs')
+    run.add_argument('-o', '--output', default='strategy_summary.csv', help='summary CSV to write')
+    run.add_argument('--rounds-dir', help='also write each file\'s rounds table here')
+    run.add_argument('-j', '--workers', type=int, help='worker processes (default: all cores)')
+    commands.add_parser('bench', help='time and cross-check the simulate engines')
+    args = parser.parse_args(argv)
 
-def main():
+    if args.command == 'run':
+        with open(args.spec) as f:
+            spec = json.load(f)
+        df = run_spec(spec, args.directory, args.output, args.rounds_dir, args.workers)
+        print(df.to_string(index=False))
+        return
+    if args.command == 'bench':
+        print(benchmark_engines().to_string(index=False))
+        return
     app = StrategyBuilder()
     app.mainloop()
 
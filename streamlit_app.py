@@ -3,6 +3,9 @@ import pandas as pd
 import os
 import glob
 
+import session_db
+from spin_store import SpinStore, create_store_file
+
 csv_directory = 'csv_files'
 
 # Ensure the directory for CSV files exists
@@ -13,28 +16,40 @@ def get_csv_files():
     """Returns a list of csv files from the csv_directory."""
     return glob.glob(os.path.join(csv_directory, '*.csv'))
 
+@st.cache_resource
+def spin_store(file_path):
+    """One append-only store per file, kept across reruns."""
+    return SpinStore(file_path)
+
+@st.cache_resource
+def catalog():
+    """The session catalog; every logged spin is mirrored into it."""
+    return session_db.connect(check_same_thread=False)
+
+@st.cache_resource
+def catalog_session(file_path):
+    """Catalog session of a file, brought in line with the file once per run of the server."""
+    return session_db.sync_session(catalog(), file_path)
+
 def create_new_csv(file_name):
     """Creates a new CSV file with the given name in the csv_directory."""
     file_path = os.path.join(csv_directory, file_name)
     if not file_path.endswith('.csv'):
         file_path += '.csv'
-    if not os.path.exists(file_path):
-        df = pd.DataFrame(columns=['Number'])
-        df.to_csv(file_path, index=False)
+    create_store_file(file_path)
+    catalog_session(file_path)
     return file_path
 
 def save_number(num, file_path):
-    df = pd.read_csv(file_path)
-    new_row = pd.DataFrame({'Number': [num]})
-    df = pd.concat([df, new_row], ignore_index=True)
-    df.to_csv(file_path, index=False)
+    session = catalog_session(file_path)
+    spin_store(file_path).append(num)
+    session_db.append_spin(catalog(), session, num)
 
 def delete_last_number(file_path):
     """Deletes the last number added to the CSV."""
-    df = pd.read_csv(file_path)
-    if not df.empty:
-        df = df[:-1]  # Remove the last row
-        df.to_csv(file_path, index=False)
+    session = catalog_session(file_path)
+    if spin_store(file_path).pop() is not None:
+        session_db.delete_last_spin(catalog(), session)
 
 def app():
     st.title('Manage CSV Files and Input Numbers')
@@ -45,6 +60,10 @@ def app():
         file_path = os.path.join(csv_directory, uploaded_file.name)
         with open(file_path, "wb") as f:
             f.write(uploaded_file.getbuffer())
+        try:
+            session_db.sync_session(catalog(), file_path)
+        except (KeyError, ValueError):
+            st.warning('The file has no valid Number column, so it was not added to the session catalog.')
         st.success('File uploaded successfully.')
 
     # Creating or selecting a CSV file
@@ -61,7 +80,7 @@ def app():
     # Display last 5 numbers and deletion option
     if selected_file:
         st.write(f'You are working with: {selected_file}')
-        df = pd.read_csv(selected_file)
+        store = spin_store(selected_file)
 
         # Layout the numbers in three rows
         numbers_per_row = 12
@@ -75,15 +94,16 @@ def app():
                     save_number(idx, selected_file)
                     st.success(f'Number {idx} saved!')
 
-        if not df.empty:
-            st.write('Last 5 numbers:', df['Number'].tail(5))
+        if len(store):
+            last = store.last(5)
+            st.write('Last 5 numbers:', pd.Series(last, name='Number', index=range(len(store) - len(last), len(store))))
             if st.button('Delete Last Number'):
                 delete_last_number(selected_file)
                 st.success('Last number deleted successfully.')
 
     # File download link
     if selected_file:
-        st.download_button('Download CSV', data=pd.read_csv(selected_file).to_csv(index=False), file_name=os.path.basename(selected_file), mime='text/csv')
+        st.download_button('Download CSV', data=spin_store(selected_file).read_bytes(), file_name=os.path.basename(selected_file), mime='text/csv')
 
 # Run the app function to start Streamlit app
 if __name__ == "__main__":
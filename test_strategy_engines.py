@@ -0,0 +1,58 @@
+"""Checks that the vectorised strategy paths agree with the reference engine.
+
+    python -m pytest test_strategy_engines.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import strategy_builder as sb
+
+RED = {'nums': sb.RED_NUMBERS, 'bet': 1}
+DOZEN = {'nums': sb.DOZEN_2, 'bet': 2}
+VOISINS = {'nums': sb.VOISINS, 'bet': 0.5}
+
+
+def assert_engines_agree(spins, bets, break_n, martingale, initial_balance=100.0):
+    slow = sb.StrategyBuilder.simulate(spins, bets, break_n, martingale, initial_balance, engine='python')
+    fast = sb.StrategyBuilder.simulate(spins, bets, break_n, martingale, initial_balance, engine='numpy')
+    assert fast[0] == slow[0]
+    assert fast[1] == slow[1]
+    pd.testing.assert_frame_equal(fast[2], slow[2], check_dtype=False)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('martingale', [True, False])
+def test_engines_agree(seed, martingale):
+    spins = np.random.default_rng(seed).integers(0, 37, 2000).tolist()
+    assert_engines_agree(spins, [RED], 3, martingale)
+
+
+@pytest.mark.parametrize('martingale', [True, False])
+def test_engines_agree_multiple_bets(martingale):
+    spins = np.random.default_rng(3).integers(0, 37, 2000).tolist()
+    assert_engines_agree(spins, [RED, DOZEN, VOISINS], 2, martingale)
+
+
+def test_engines_agree_with_table_limit():
+    spins = np.random.default_rng(4).integers(0, 37, 2000).tolist()
+    bets = [dict(RED, limit=16), dict(DOZEN, limit=16, progression='Fibonacci')]
+    assert_engines_agree(spins, bets, 1, True)
+
+
+@pytest.mark.parametrize('bets', [[RED], [RED, DOZEN]])
+def test_engines_agree_on_empty_spins(bets):
+    assert_engines_agree([], bets, 3, True)
+
+
+def test_monte_carlo_per_bet_progressions():
+    bets = [{'nums': sb.RED_NUMBERS, 'bet': 1, 'progression': 'Fibonacci', 'limit': 50},
+            {'nums': sb.DOZEN_1, 'bet': 1, 'limit': 50}]
+    summary, per_session = sb.monte_carlo(bets, 2, True, 100.0, sessions=200, spins=100, workers=1)
+    assert len(per_session) == 200
+    assert (per_session['Min Balance'] <= per_session['Final Balance']).all()
+    # every session is one simulate_numpy run over its own spins
+    rng = np.random.default_rng(np.random.SeedSequence(0).spawn(1)[0])
+    wheel = rng.choice(37, size=(100, 200), p=sb.wheel_probabilities())
+    final, _, _ = sb.StrategyBuilder.simulate_numpy(wheel[:, 0].tolist(), bets, 2, True, 100.0)
+    assert per_session['Final Balance'].iloc[0] == final
@@ -1,12 +1,20 @@
 import csv
 import os
+import tempfile
+import zlib
 from datetime import datetime
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
+
+import rolling
+import session_db
 
 CSV_DIR = 'roulette_games'
 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 CSV_PATH = os.path.join(CSV_DIR, f'game_{timestamp}.csv')
+# the journal is folded back into the CSV on close, or once it holds as many
+# edits as the CSV has rows (and at least this many), so rewrites stay rare
+COMPACT_EVERY = 1000
 
 RED_NUMBERS = {1,3,5,7,9,12,14,16,18,19,21,23,25,27,30,32,34,36}
 BLACK_NUMBERS = {2,4,6,8,10,11,13,15,17,20,22,24,26,28,29,31,33,35}
@@ -15,6 +23,9 @@ VOISINS = {22,18,29,7,28,12,35,3,26,0,32,15,19,4,21,2,25}
 ORPHELINS = {1,20,14,31,9,17,34,6}
 TIERS = {27,13,36,11,30,8,23,10,5,24,16,33}
 
+DOZENS = {'Dozen 1': range(1, 13), 'Dozen 2': range(13, 25), 'Dozen 3': range(25, 37)}
+HOT_COLD_WINDOW = 37
+
 
 def ensure_csv():
     os.makedirs(CSV_DIR, exist_ok=True)
@@ -24,30 +35,150 @@ def ensure_csv():
             writer.writerow(['Number'])
 
 
-def load_numbers():
-    ensure_csv()
-    with open(CSV_PATH, newline='') as f:
+def load_numbers(path=CSV_PATH):
+    if path == CSV_PATH:
+        ensure_csv()
+    with open(path, newline='') as f:
         reader = csv.DictReader(f)
         return [int(row['Number']) for row in reader]
 
 
-def save_number(num):
-    ensure_csv()
-    with open(CSV_PATH, 'a', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow([num])
+def checksum(numbers):
+    return zlib.crc32(','.join(map(str, numbers)).encode())
+
+
+def write_atomic(path, text):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    with os.fdopen(fd, 'w', newline='') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class SessionJournal:
+    """Session numbers kept as the Number CSV plus a journal of later edits.
+
+    Every add, undo and redo appends one line to ``<session>.journal``, so
+    each edit is O(1) file I/O and undo/redo go back as far as the session.
+    The journal starts with ``base N C``, the number of CSV rows it applies
+    to and a checksum of them, followed by the redo stack at that point.
+    ``compact`` writes the new journal to ``<session>.journal.new`` first,
+    then rewrites the CSV, then moves the new journal into place.  If that
+    is interrupted, opening the session keeps whichever journal matches the
+    CSV on disk, so it replays to the same numbers.  A journal whose base
+    does not match the CSV (the file was changed by something else) is not
+    applied; it is moved to ``<session>.journal.rejected`` and named in
+    ``rejected``.
+
+    With a ``catalog`` connection every edit is mirrored into the session
+    catalog as well.
+    """
+
+    def __init__(self, csv_path=CSV_PATH, journal_path=None, catalog=None, machine=None):
+        self.csv_path = csv_path
+        self.journal_path = journal_path or os.path.splitext(csv_path)[0] + '.journal'
+        self.new_journal_path = self.journal_path + '.new'
+        self.numbers = load_numbers(csv_path)
+        self.redo_stack = []
+        self.pending = 0
+        self.rejected = None
+        if os.path.exists(self.new_journal_path):
+            self.finish_compaction()
+        if os.path.exists(self.journal_path) and not self.replay():
+            self.rejected = self.journal_path + '.rejected'
+            os.replace(self.journal_path, self.rejected)
+        if not os.path.exists(self.journal_path):
+            write_atomic(self.journal_path, self.header())
+        self.catalog = catalog
+        if catalog is not None:
+            self.session = session_db.sync_session(catalog, csv_path, self.numbers, machine)
+
+    def header(self):
+        return f'base {len(self.numbers)} {checksum(self.numbers)}\n'
+
+    def finish_compaction(self):
+        """Settle a compaction that was interrupted.
+
+        The new journal is kept if the CSV was already rewritten to match it,
+        otherwise the CSV is untouched and the old journal still applies.
+        """
+        with open(self.new_journal_path) as f:
+            first = f.readline().split()
+        if first == self.header().split():
+            os.replace(self.new_journal_path, self.journal_path)
+        else:
+            os.remove(self.new_journal_path)
+
+    def replay(self):
+        """Apply the journal to the CSV numbers; ``False`` if its base doesn't match."""
+        with open(self.journal_path) as f:
+            lines = f.read().splitlines()
+        if lines and lines[0].startswith('base '):
+            _, count, *crc = lines[0].split()
+            count = int(count)
+            if len(self.numbers) != count or crc and checksum(self.numbers) != int(crc[0]):
+                return False
+        for line in lines[1:]:
+            op, _, arg = line.partition(' ')
+            if op == 'add' and arg:
+                self.numbers.append(int(arg))
+                self.redo_stack.clear()
+            elif op == 'undo' and self.numbers:
+                self.redo_stack.append(self.numbers.pop())
+            elif op == 'stack' and arg:
+                self.redo_stack.append(int(arg))
+            elif op == 'redo' and self.redo_stack:
+                self.numbers.append(self.redo_stack.pop())
+        self.pending = sum(1 for line in lines if line.split(' ')[0] in ('add', 'undo', 'redo'))
+        return True
+
+    def _log(self, line):
+        with open(self.journal_path, 'a') as f:
+            f.write(line + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.pending += 1
+        if self.pending >= max(COMPACT_EVERY, len(self.numbers)):
+            self.compact()
+
+    def add(self, num):
+        self.numbers.append(num)
+        self.redo_stack.clear()
+        self._log(f'add {num}')
+        if self.catalog is not None:
+            session_db.append_spin(self.catalog, self.session, num)
 
+    def undo(self):
+        """Take back the last number; returns it, or ``None`` if there is none."""
+        if not self.numbers:
+            return None
+        num = self.numbers.pop()
+        self.redo_stack.append(num)
+        self._log('undo')
+        if self.catalog is not None:
+            session_db.delete_last_spin(self.catalog, self.session)
+        return num
+
+    def redo(self):
+        """Put back the last undone number; returns it, or ``None``."""
+        if not self.redo_stack:
+            return None
+        num = self.redo_stack.pop()
+        self.numbers.append(num)
+        self._log('redo')
+        if self.catalog is not None:
+            session_db.append_spin(self.catalog, self.session, num)
+        return num
 
-def undo_last():
-    ensure_csv()
-    rows = load_numbers()
-    if rows:
-        rows = rows[:-1]
-        with open(CSV_PATH, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Number'])
-            for n in rows:
-                writer.writerow([n])
+    def compact(self):
+        """Write the numbers to the CSV and restart the journal from them."""
+        if not self.pending:
+            return
+        write_atomic(self.new_journal_path, self.header() + ''.join(f'stack {n}\n' for n in self.redo_stack))
+        write_atomic(self.csv_path, 'Number\n' + ''.join(f'{n}\n' for n in self.numbers))
+        os.replace(self.new_journal_path, self.journal_path)
+        self.pending = 0
 
 
 def color_number(num):
@@ -70,10 +201,21 @@ class RouletteApp(tk.Tk):
         self.title('Roulette Number Logger')
         # use full screen
         self.geometry(f"{self.winfo_screenwidth()}x{self.winfo_screenheight()}")
-        self.numbers = load_numbers()
+        self.catalog = session_db.connect()
+        self.journal = SessionJournal(catalog=self.catalog)
+        self.numbers = self.journal.numbers
 
         self.create_widgets()
+        self.bind('<Control-z>', self.shortcut(self.undo))
+        self.bind('<Control-y>', self.shortcut(self.redo))
+        self.bind('<Control-Z>', self.shortcut(self.redo))
+        self.protocol('WM_DELETE_WINDOW', self.close)
         self.update_ui()
+        if self.journal.rejected:
+            messagebox.showwarning(
+                'Journal not applied',
+                f'{self.journal.csv_path} was changed outside the logger, so its edit journal '
+                f'no longer matches it. The journal was kept as {self.journal.rejected}.')
 
     def create_widgets(self):
         # Dozen counts
@@ -82,9 +224,9 @@ class RouletteApp(tk.Tk):
         self.d1_var = tk.StringVar()
         self.d2_var = tk.StringVar()
         self.d3_var = tk.StringVar()
-        ttk.Label(top, textvariable=self.d1_var, width=12).grid(row=0, column=0)
-        ttk.Label(top, textvariable=self.d2_var, width=12).grid(row=0, column=1)
-        ttk.Label(top, textvariable=self.d3_var, width=12).grid(row=0, column=2)
+        ttk.Label(top, textvariable=self.d1_var, width=16).grid(row=0, column=0)
+        ttk.Label(top, textvariable=self.d2_var, width=16).grid(row=0, column=1)
+        ttk.Label(top, textvariable=self.d3_var, width=16).grid(row=0, column=2)
 
         # Number buttons
         btn_frame = ttk.Frame(self)
@@ -95,8 +237,12 @@ class RouletteApp(tk.Tk):
                              command=lambda n=num: self.add_number(n))
             btn.grid(row=r, column=c, padx=2, pady=2)
 
-        undo_btn = ttk.Button(self, text='Undo Last', command=self.undo)
-        undo_btn.pack(pady=5)
+        edit_frame = ttk.Frame(self)
+        edit_frame.pack(pady=5)
+        undo_btn = ttk.Button(edit_frame, text='Undo Last (Ctrl+Z)', command=self.undo)
+        undo_btn.grid(row=0, column=0, padx=2)
+        redo_btn = ttk.Button(edit_frame, text='Redo (Ctrl+Y)', command=self.redo)
+        redo_btn.grid(row=0, column=1, padx=2)
 
         # Text box size controls
         size_frame = ttk.Frame(self)
@@ -131,24 +277,38 @@ class RouletteApp(tk.Tk):
         self.sector_text.tag_config('blue', background='blue', foreground='white')
         self.sector_text.tag_config('orange', background='orange', foreground='white')
 
+    def shortcut(self, action):
+        """Key handler running ``action`` unless a text entry has focus."""
+        def handler(event):
+            if not isinstance(self.focus_get(), (tk.Entry, ttk.Entry)):
+                action()
+        return handler
+
     def add_number(self, num):
-        save_number(num)
-        self.numbers.append(num)
+        self.journal.add(num)
         self.update_ui()
 
     def undo(self):
-        undo_last()
-        if self.numbers:
-            self.numbers.pop()
-        self.update_ui()
+        if self.journal.undo() is not None:
+            self.update_ui()
+
+    def redo(self):
+        if self.journal.redo() is not None:
+            self.update_ui()
+
+    def close(self):
+        self.journal.compact()
+        self.catalog.close()
+        self.destroy()
 
     def update_ui(self):
         d1 = sum(1 for n in self.numbers if 1 <= n <= 12)
         d2 = sum(1 for n in self.numbers if 13 <= n <= 24)
         d3 = sum(1 for n in self.numbers if 25 <= n <= 36)
-        self.d1_var.set(f'Dozen 1: {d1}')
-        self.d2_var.set(f'Dozen 2: {d2}')
-        self.d3_var.set(f'Dozen 3: {d3}')
+        states = rolling.hot_cold(self.numbers, DOZENS, HOT_COLD_WINDOW)
+        self.d1_var.set(f'Dozen 1: {d1} {states["Dozen 1"]}'.strip())
+        self.d2_var.set(f'Dozen 2: {d2} {states["Dozen 2"]}'.strip())
+        self.d3_var.set(f'Dozen 3: {d3} {states["Dozen 3"]}'.strip())
 
         self.show_history()
         self.show_sector_history()